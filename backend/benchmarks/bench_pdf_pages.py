@@ -0,0 +1,99 @@
+"""Serial vs page-parallel PDF extraction for 1-200 page documents.
+
+Run from backend/: python benchmarks/bench_pdf_pages.py [--repeat N]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import document_loader
+from document_loader import DocumentLoader, get_pdf_pool, shutdown_pdf_pool
+
+PAGE_COUNTS = [1, 8, 16, 32, 64, 128, 200]
+LINES_PER_PAGE = 40
+
+
+def make_text_pdf(page_count: int) -> bytes:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(page_count):
+        lines = [
+            f"({'Page %d line %d: built REST APIs in Python, Django and PostgreSQL' % (page + 1, line)}) Tj T*"
+            for line in range(LINES_PER_PAGE)
+        ]
+        stream = ("BT /F1 9 Tf 12 TL 40 800 Td " + " ".join(lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at))
+    return out.getvalue()
+
+
+def time_extraction(pdf_bytes: bytes, parallel: bool, repeat: int, max_chars: int = None) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        if max_chars is None:
+            pages = list(DocumentLoader.iter_pdf_pages(io.BytesIO(pdf_bytes), parallel=parallel))
+            assert pages and "line 0" in pages[0]
+        else:
+            DocumentLoader.load_pdf(io.BytesIO(pdf_bytes), max_chars=max_chars, parallel=parallel)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Warm the shared pool so the first parallel row does not pay for process start-up
+    get_pdf_pool().submit(int).result()
+    print(f"cpus={os.cpu_count()} workers={document_loader.PDF_EXTRACTION_WORKERS} "
+          f"parallel_min_pages={document_loader.PDF_PARALLEL_MIN_PAGES} range_pages={document_loader.PDF_RANGE_PAGES}")
+    print(f"{'pages':>6} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}")
+    try:
+        for page_count in PAGE_COUNTS:
+            pdf_bytes = make_text_pdf(page_count)
+            serial = time_extraction(pdf_bytes, parallel=False, repeat=args.repeat)
+            parallel = time_extraction(pdf_bytes, parallel=True, repeat=args.repeat)
+            print(f"{page_count:>6} {serial:>10.1f} {parallel:>12.1f} {serial / parallel:>7.2f}x")
+
+        pdf_bytes = make_text_pdf(200)
+        cutoff = 5000
+        serial = time_extraction(pdf_bytes, parallel=False, repeat=args.repeat, max_chars=cutoff)
+        parallel = time_extraction(pdf_bytes, parallel=True, repeat=args.repeat, max_chars=cutoff)
+        print(f"200 pages, max_chars={cutoff}: serial {serial:.1f} ms, parallel {parallel:.1f} ms "
+              f"(outstanding ranges cancelled on early stop)")
+    finally:
+        shutdown_pdf_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""JSON dict round trip vs the compact state codec for 200-turn interview sessions.
+
+Run from backend/: python benchmarks/bench_state_codec.py [--turns 200] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "bench")
+
+import state_codec
+from conversation_manager import ConversationManager, ConversationStage, ConversationState
+
+
+def make_session(turns: int) -> ConversationState:
+    state = ConversationState()
+    state.stage = ConversationStage.TECH_QUESTIONS
+    state.update_candidate_info({
+        "full_name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "phone": "+44 20 7946 0000",
+        "years_of_experience": "7",
+        "desired_positions": "Backend Engineer",
+        "current_location": "London",
+        "tech_stack": ["Python", "Django", "PostgreSQL", "Redis", "Docker"],
+    })
+    state.set_tech_questions({
+        tech: [f"Question {i} about {tech} internals and trade-offs in production systems?" for i in range(5)]
+        for tech in ("Python", "Django", "PostgreSQL", "Redis", "Docker")
+    })
+    state.set_document_context({
+        "filename": "resume.pdf",
+        "skills": ["Python", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes"],
+        "experience": [f"Role {i}: built and operated services handling {i * 1000} requests/s" for i in range(6)],
+    })
+    for turn in range(turns):
+        state.add_message("user", f"Turn {turn}: I used Django with PostgreSQL and Redis to cut p95 latency "
+                                  f"by caching hot queries and batching writes in a background worker.")
+        state.add_message("assistant", f"Thanks. Follow-up {turn}: how did you invalidate the cache when rows "
+                                       f"changed, and what consistency did clients observe during failover?")
+    return state
+
+
+def time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    state = make_session(args.turns)
+    # Baseline: what the endpoints did before the codec, a dict handed to pydantic and parsed back
+    as_json = json.dumps(state.to_dict())
+    encoders = [("json dict", lambda: json.dumps(state.to_dict()),
+                 lambda: ConversationState(json.loads(as_json)), as_json.encode("utf-8"))]
+    variants = [("json", False), ("msgpack", False), ("msgpack", True)]
+    for codec, compress in variants:
+        if codec == "msgpack" and state_codec.msgpack is None:
+            continue
+        if compress and state_codec.zstandard is None:
+            continue
+        payload = state_codec.encode_state(state.to_record(), codec=codec, compress=compress)
+        encoders.append((
+            f"{codec}{' + zstd' if compress else ''}",
+            lambda codec=codec, compress=compress: state_codec.encode_state(state.to_record(), codec, compress),
+            lambda payload=payload: ConversationManager.restore_conversation(payload),
+            payload,
+        ))
+
+    print(f"{args.turns} turns ({len(state.conversation_history)} messages), median of {args.repeat} runs, "
+          f"orjson={'yes' if state_codec.orjson is not None else 'no'}")
+    print(f"{'format':>14} {'bytes':>8} {'encode ms':>10} {'restore ms':>11} {'round trip ms':>14}")
+    baseline = None
+    for name, encode, restore, payload in encoders:
+        restored = restore()
+        assert restored.conversation_history[-1][1] == state.conversation_history[-1][1]
+        encode_ms = time_ms(encode, args.repeat)
+        restore_ms = time_ms(restore, args.repeat)
+        total = encode_ms + restore_ms
+        baseline = baseline or total
+        print(f"{name:>14} {len(payload):>8} {encode_ms:>10.3f} {restore_ms:>11.3f} "
+              f"{total:>14.3f}  ({baseline / total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
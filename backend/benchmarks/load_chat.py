@@ -0,0 +1,96 @@
+"""Throughput of /chat/hiring as concurrent interview sessions grow, with the LLM served by a local fake.
+
+Run from backend/: python benchmarks/load_chat.py [--latency 0.2] [--sessions 1,4,16,64]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _BACKEND_DIR)
+sys.path.insert(0, os.path.join(_BACKEND_DIR, "tests"))
+os.environ.setdefault("GROQ_API_KEY", "load-test")
+os.environ.setdefault("PARSE_CACHE_ENABLED", "false")
+os.environ.setdefault("QUESTION_BANK_PATH", "")
+
+import httpx
+
+from fake_llm_server import FakeLLMServer, Reply
+
+TURNS = [
+    "Hello",
+    "My name is Ada Lovelace and I live in London",
+    "I have 5 years of experience with Python and Django",
+]
+
+
+async def run_session(client: httpx.AsyncClient, latencies: list):
+    encoded_state = None
+    for message in TURNS:
+        started = time.perf_counter()
+        response = await client.post("/chat/hiring", json={
+            "message": message,
+            # Sessions start in info gathering so turns exercise field extraction as well as replies
+            "conversation_state": None if encoded_state else {"stage": "info_gathering"},
+            "encoded_state": encoded_state,
+            "state_format": "compact",
+        })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        encoded_state = response.json()["encoded_state"]
+
+
+async def run_level(app, sessions: int):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_session(client, latencies) for _ in range(sessions)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "turns": len(latencies),
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the fake LLM takes per call")
+    parser.add_argument("--sessions", default="1,4,16,64", help="comma-separated concurrency levels")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.sessions.split(",")]
+
+    script = lambda n, model: Reply(content='{"full_name": "Ada Lovelace"}', delay=args.latency)
+    with FakeLLMServer(script) as server:
+        import llm_client
+        llm_client.GROQ_BASE_URL = server.base_url
+        import main as backend
+
+        print(f"fake LLM latency={args.latency * 1000:.0f} ms, "
+              f"LLM_MAX_CONCURRENCY={backend.LLM_MAX_CONCURRENCY}, EXTRACTION_MODE={backend.EXTRACTION_MODE}, "
+              f"{len(TURNS)} turns per session")
+        print(f"{'sessions':>8} {'turns':>6} {'elapsed s':>10} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+        # One event loop for every level: the pooled LLM HTTP client is bound to the loop it first ran on
+        async def run_levels():
+            for sessions in levels:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = await run_level(backend.app, sessions)
+                print(f"{sessions:>8} {result['turns']:>6} {result['elapsed']:>10.2f} "
+                      f"{result['throughput']:>8.1f} {result['p50']:>8.0f} {result['p95']:>8.0f}")
+            print(f"LLM calls served: {len(server.requests)}, retries: {backend.llm_caller.metrics['retries']}")
+
+        asyncio.run(run_levels())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,22 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from enum import Enum
 import json
+import re
+import os
+
+from skill_taxonomy import merge_skills
+from state_codec import encode_state, decode_state
+
+
+RECENT_MESSAGES = int(os.getenv("HISTORY_RECENT_MESSAGES", "6"))
+HISTORY_TOKEN_CAP = int(os.getenv("HISTORY_TOKEN_CAP", "1500"))
+RECENT_MESSAGE_CHARS = 600
+SUMMARY_LINE_CHARS = 160
+DOCUMENT_DIGEST_TOKENS = int(os.getenv("DOCUMENT_DIGEST_TOKENS", "600"))
+CHARS_PER_TOKEN = 4
+STATE_RECORD_FIELDS = 8
+
+_DOCUMENT_CONTEXT_RE = re.compile(r"\[DOCUMENT CONTEXT[^\]]*\].*?User Question:\s*", re.DOTALL)
 
 
 class ConversationStage(str, Enum):
@@ -10,63 +26,195 @@ class ConversationStage(str, Enum):
     CONCLUSION = "conclusion"
 
 
+EMPTY_CANDIDATE_INFO = {
+    "full_name": None,
+    "email": None,
+    "phone": None,
+    "years_of_experience": None,
+    "desired_position": None,
+    "current_location": None,
+    "tech_stack": None
+}
+
+
 class ConversationState:
     
+    __slots__ = (
+        "stage", "candidate_info", "tech_questions", "conversation_history", "questions_asked",
+        "history_summary", "summarized_count", "document_context", "_history_text", "_document_digest"
+    )
+    
     def __init__(self, state_dict: Optional[Dict] = None):
         if state_dict:
             self.stage = state_dict.get("stage", ConversationStage.GREETING)
-            self.candidate_info = state_dict.get("candidate_info", {})
+            self.candidate_info = {**EMPTY_CANDIDATE_INFO, **(state_dict.get("candidate_info") or {})}
             self.tech_questions = state_dict.get("tech_questions", {})
-            self.conversation_history = state_dict.get("conversation_history", [])
+            self.conversation_history = [
+                (msg["role"], msg["content"]) if isinstance(msg, dict) else msg
+                for msg in state_dict.get("conversation_history", [])
+            ]
             self.questions_asked = state_dict.get("questions_asked", [])
+            self.history_summary = state_dict.get("history_summary", "")
+            self.summarized_count = state_dict.get("summarized_count", 0)
+            self.document_context = state_dict.get("document_context")
         else:
             self.stage = ConversationStage.GREETING
-            self.candidate_info = {
-                "full_name": None,
-                "email": None,
-                "phone": None,
-                "years_of_experience": None,
-                "desired_position": None,
-                "current_location": None,
-                "tech_stack": None
-            }
+            self.candidate_info = dict(EMPTY_CANDIDATE_INFO)
             self.tech_questions = {}
             self.conversation_history = []
             self.questions_asked = []
+            self.history_summary = ""
+            self.summarized_count = 0
+            self.document_context = None
+        self._history_text = None
+        self._document_digest = None
     
     def to_dict(self) -> Dict:
         return {
             "stage": self.stage,
             "candidate_info": self.candidate_info,
             "tech_questions": self.tech_questions,
-            "conversation_history": self.conversation_history,
-            "questions_asked": self.questions_asked
+            "conversation_history": [
+                {"role": role, "content": content} for role, content in self.conversation_history
+            ],
+            "questions_asked": self.questions_asked,
+            "history_summary": self.history_summary,
+            "summarized_count": self.summarized_count,
+            "document_context": self.document_context
         }
     
+    def to_record(self) -> List:
+        stage = self.stage.value if isinstance(self.stage, ConversationStage) else self.stage
+        return [
+            stage,
+            self.candidate_info,
+            self.tech_questions,
+            self.conversation_history,
+            self.questions_asked,
+            self.history_summary,
+            self.summarized_count,
+            self.document_context
+        ]
+    
+    @classmethod
+    def from_record(cls, record: List) -> "ConversationState":
+        state = cls.__new__(cls)
+        (state.stage, state.candidate_info, state.tech_questions, state.conversation_history,
+         state.questions_asked, state.history_summary, state.summarized_count, state.document_context) = record
+        state._history_text = None
+        state._document_digest = None
+        return state
+    
     def add_message(self, role: str, content: str):
-        self.conversation_history.append({
-            "role": role,
-            "content": content
-        })
+        self.conversation_history.append((role, content))
+        self._history_text = None
+    
+    def get_last_assistant_message(self) -> Optional[str]:
+        for role, content in reversed(self.conversation_history):
+            if role == "assistant":
+                return content
+        return None
+    
+    @staticmethod
+    def _format_message(msg, max_chars: int) -> str:
+        role, content = msg
+        role = "Assistant" if role == "assistant" else "Candidate"
+        content = _DOCUMENT_CONTEXT_RE.sub("[document context omitted] ", content)
+        content = " ".join(content.split())
+        if len(content) > max_chars:
+            content = content[:max_chars].rstrip() + "..."
+        return f"{role}: {content}"
+    
+    def refresh_history_summary(self):
+        cutoff = max(0, len(self.conversation_history) - RECENT_MESSAGES)
+        if cutoff <= self.summarized_count:
+            return
+        
+        summary_lines = self.history_summary.split("\n") if self.history_summary else []
+        for msg in self.conversation_history[self.summarized_count:cutoff]:
+            summary_lines.append(self._format_message(msg, SUMMARY_LINE_CHARS))
+        
+        max_chars = HISTORY_TOKEN_CAP * CHARS_PER_TOKEN // 2
+        total = sum(len(line) + 1 for line in summary_lines)
+        while summary_lines and total > max_chars:
+            total -= len(summary_lines.pop(0)) + 1
+        
+        self.history_summary = "\n".join(summary_lines)
+        self.summarized_count = cutoff
+        self._history_text = None
     
     def get_conversation_history_text(self) -> str:
         if not self.conversation_history:
             return "No previous messages."
         
-        history_text = []
-        for msg in self.conversation_history[-10:]:
-            role = "Assistant" if msg["role"] == "assistant" else "Candidate"
-            history_text.append(f"{role}: {msg['content']}")
+        if self._history_text is None:
+            recent = [
+                self._format_message(msg, RECENT_MESSAGE_CHARS)
+                for msg in self.conversation_history[self.summarized_count:]
+            ]
+            max_chars = HISTORY_TOKEN_CAP * CHARS_PER_TOKEN - len(self.history_summary)
+            total = sum(len(line) + 1 for line in recent)
+            while len(recent) > 1 and total > max_chars:
+                total -= len(recent.pop(0)) + 1
+            
+            if self.history_summary:
+                self._history_text = (
+                    f"Summary of earlier messages:\n{self.history_summary}\n\n"
+                    f"Recent messages:\n" + "\n".join(recent)
+                )
+            else:
+                self._history_text = "\n".join(recent)
         
-        return "\n".join(history_text)
+        return self._history_text
+    
+    def set_document_context(self, document_context: Optional[Dict]):
+        self.document_context = document_context
+        self._document_digest = None
+    
+    @staticmethod
+    def _digest_lines(value, label: str, lines: List[str]):
+        if value is None or value == "" or value == [] or value == {}:
+            return
+        if isinstance(value, dict):
+            for key, item in value.items():
+                ConversationState._digest_lines(item, key, lines)
+        elif isinstance(value, list):
+            if all(not isinstance(item, (dict, list)) for item in value):
+                lines.append(f"{label}: {', '.join(str(item) for item in value)}")
+            else:
+                for item in value:
+                    if isinstance(item, dict):
+                        fields = "; ".join(f"{k}={v}" for k, v in item.items() if v not in (None, "", []))
+                        if fields:
+                            lines.append(f"{label}: {fields}")
+                    else:
+                        ConversationState._digest_lines(item, label, lines)
+        else:
+            lines.append(f"{label}: {value}")
+    
+    def get_document_digest(self) -> str:
+        if not self.document_context:
+            return ""
+        
+        if self._document_digest is None:
+            lines = [f"{self.document_context.get('type', 'Document')}: {self.document_context.get('filename', '')}"]
+            self._digest_lines(self.document_context.get("data"), "data", lines)
+            
+            digest = "\n".join(" ".join(line.split()) for line in lines)
+            max_chars = DOCUMENT_DIGEST_TOKENS * CHARS_PER_TOKEN
+            if len(digest) > max_chars:
+                digest = digest[:max_chars].rstrip() + "..."
+            self._document_digest = digest
+        
+        return self._document_digest
     
     def update_candidate_info(self, extracted_info: Dict):
         for key, value in extracted_info.items():
             if value is not None and key in self.candidate_info:
-                if key == "tech_stack" and self.candidate_info[key]:
+                if key == "tech_stack":
                     existing = self.candidate_info[key] if isinstance(self.candidate_info[key], list) else []
                     new_items = value if isinstance(value, list) else [value]
-                    self.candidate_info[key] = list(set(existing + new_items))
+                    self.candidate_info[key] = merge_skills(existing, new_items)
                 else:
                     self.candidate_info[key] = value
     
@@ -135,8 +283,21 @@ class ConversationManager:
         return ConversationState()
     
     @staticmethod
-    def restore_conversation(state_dict: Dict) -> ConversationState:
-        return ConversationState(state_dict)
+    def restore_conversation(state: Union[Dict, bytes], trusted: bool = True) -> ConversationState:
+        # Only server-stored state may be compressed; client payloads could be decompression bombs
+        if isinstance(state, (bytes, bytearray, memoryview, str)):
+            state = decode_state(state, allow_compressed=trusted)
+            if isinstance(state, list):
+                if len(state) != STATE_RECORD_FIELDS:
+                    raise ValueError(f"State record must have {STATE_RECORD_FIELDS} fields")
+                return ConversationState.from_record(state)
+        if not isinstance(state, dict):
+            raise ValueError("State must be a record or an object")
+        return ConversationState(state)
+    
+    @staticmethod
+    def serialize_conversation(state: ConversationState, compress: bool = True) -> bytes:
+        return encode_state(state.to_record(), compress=compress)
     
     @staticmethod
     def determine_next_action(state: ConversationState, user_message: str) -> str:
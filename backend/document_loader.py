@@ -1,58 +1,229 @@
 from pypdf import PdfReader
 from docx import Document
-import base64
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import threading
+import math
+import re
+import io
+import os
+
+
+MAX_PAGES = int(os.getenv("DOCUMENT_MAX_PAGES", "200"))
+MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "200000"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "4"))
+PDF_RANGE_PAGES = int(os.getenv("PDF_RANGE_PAGES", "8"))
+CHUNK_CHARS = int(os.getenv("DOCUMENT_CHUNK_CHARS", "2000"))
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+SECTION_HEADINGS = {
+    "summary", "profile", "professional summary", "objective", "career objective", "about me",
+    "contact", "contact information", "personal details", "personal information",
+    "experience", "work experience", "professional experience", "employment history", "work history",
+    "education", "academic background", "qualifications",
+    "skills", "technical skills", "core competencies", "technologies", "tech stack",
+    "projects", "key projects", "certifications", "certificates", "licenses",
+    "awards", "achievements", "publications", "languages", "interests", "hobbies", "references",
+    "job description", "about the role", "about us", "about the company", "responsibilities",
+    "key responsibilities", "requirements", "required skills", "preferred qualifications",
+    "nice to have", "benefits", "perks", "compensation", "location"
+}
+
+_WHITESPACE_RE = re.compile(r"[ \t\f\v\u00a0]+")
+
+
+def _extract_pdf_page_range(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    # One pool for all uploads, so concurrent large PDFs queue instead of each spawning workers
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACTION_WORKERS)
+        return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
 
 
 class DocumentLoader:
-        
+
     @staticmethod
-    def load_pdf(file_content: bytes) -> str:
+    def normalize_lines(text: str) -> Iterator[str]:
+        for line in text.splitlines():
+            line = _WHITESPACE_RE.sub(" ", line).strip()
+            if line:
+                yield line
+
+    @staticmethod
+    def match_section(line: str) -> Optional[str]:
+        if len(line) > 40:
+            return None
+        candidate = line.rstrip(":").strip().lower()
+        return candidate if candidate in SECTION_HEADINGS else None
+
+    @staticmethod
+    def iter_units(file_content, file_name: str, parallel: bool = True) -> Iterator[Tuple[Optional[int], str]]:
+        file_lower = file_name.lower()
+        if file_lower.endswith('.pdf'):
+            pages = DocumentLoader.iter_pdf_pages(file_content, parallel=parallel)
+            return ((page, text) for page, text in enumerate(pages, 1))
+        elif file_lower.endswith('.docx'):
+            return ((None, text) for text in DocumentLoader.iter_docx_paragraphs(file_content))
+        elif file_lower.endswith('.txt'):
+            return iter([(None, DocumentLoader.load_txt(file_content))])
+        else:
+            raise ValueError("Unsupported format.")
+
+    @staticmethod
+    def iter_chunks(file_content, file_name: str, max_chars: int = MAX_CHARS,
+                    chunk_chars: int = CHUNK_CHARS, parallel: bool = True) -> Iterator[Dict]:
+        units = DocumentLoader.iter_units(file_content, file_name, parallel=parallel)
+        return DocumentLoader._chunk_units(units, max_chars, chunk_chars)
+
+    @staticmethod
+    def _chunk_units(units: Iterable[Tuple[Optional[int], str]], max_chars: int, chunk_chars: int) -> Iterator[Dict]:
+        section = None
+        lines = []
+        size = 0
+        emitted = 0
+        index = 0
+        current_page = None
+
+        for page, raw_text in units:
+            for line in DocumentLoader.normalize_lines(raw_text):
+                heading = DocumentLoader.match_section(line)
+                if (heading or size + len(line) > chunk_chars) and lines:
+                    yield {"index": index, "page": current_page, "section": section, "text": "\n".join(lines)}
+                    index += 1
+                    lines, size = [], 0
+                if heading:
+                    section = heading
+
+                remaining = max_chars - emitted
+                if remaining <= 0:
+                    break
+                line = line[:remaining]
+                current_page = page
+                lines.append(line)
+                size += len(line) + 1
+                emitted += len(line) + 1
+
+            if page is not None and lines:
+                yield {"index": index, "page": current_page, "section": section, "text": "\n".join(lines)}
+                index += 1
+                lines, size = [], 0
+
+            if emitted >= max_chars:
+                break
+
+        if lines:
+            yield {"index": index, "page": current_page, "section": section, "text": "\n".join(lines)}
+
+    @staticmethod
+    def chunks_to_text(chunks: Iterable[Dict]) -> str:
+        return "\n".join(chunk["text"] for chunk in chunks)
+
+    @staticmethod
+    def join_limited(parts: Iterable[str], max_chars: int = MAX_CHARS) -> str:
+        collected = []
+        total = 0
+        for part in parts:
+            remaining = max_chars - total
+            if remaining <= 0:
+                break
+            if len(part) > remaining:
+                part = part[:remaining]
+            collected.append(part)
+            total += len(part) + 1
+        return "\n".join(collected)
+
+    @staticmethod
+    def iter_pdf_pages(file_content, max_pages: int = MAX_PAGES, parallel: bool = True) -> Iterator[str]:
+        pdf_reader = PdfReader(file_content)
+        page_count = min(len(pdf_reader.pages), max_pages)
+
+        if parallel and PDF_EXTRACTION_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+            file_content.seek(0)
+            pdf_bytes = file_content.read()
+            # Small ranges keep the first pages coming quickly and leave queued work to cancel
+            step = max(PDF_RANGE_PAGES, math.ceil(page_count / (PDF_EXTRACTION_WORKERS * 8)))
+            pool = get_pdf_pool()
+            futures = [
+                pool.submit(_extract_pdf_page_range, pdf_bytes, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ]
+            try:
+                for future in futures:
+                    yield from future.result()
+            finally:
+                # Reached when the caller stops early (max_chars): drop ranges nobody will read
+                for future in futures:
+                    future.cancel()
+            return
+
+        for i in range(page_count):
+            yield pdf_reader.pages[i].extract_text() or ""
+
+    @staticmethod
+    def iter_docx_paragraphs(file_content) -> Iterator[str]:
+        doc = Document(file_content)
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
+
+    @staticmethod
+    def load_pdf(file_content, max_chars: int = MAX_CHARS, parallel: bool = True) -> str:
         try:
-            pdf_reader = PdfReader(file_content)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            pages = DocumentLoader.iter_pdf_pages(file_content, parallel=parallel)
+            return DocumentLoader.join_limited(pages, max_chars).strip()
         except Exception as e:
             raise Exception(f"PDF error: {str(e)}")
-    
+
     @staticmethod
-    def load_docx(file_content: bytes) -> str:
+    def load_docx(file_content, max_chars: int = MAX_CHARS) -> str:
         try:
-            doc = Document(file_content)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            paragraphs = DocumentLoader.iter_docx_paragraphs(file_content)
+            return DocumentLoader.join_limited(paragraphs, max_chars).strip()
         except Exception as e:
             raise Exception(f"DOCX error: {str(e)}")
-    
+
     @staticmethod
-    def load_txt(file_content: bytes) -> str:
+    def load_txt(file_content, max_chars: int = MAX_CHARS) -> str:
         try:
+            raw = file_content.read() if hasattr(file_content, "read") else file_content
             try:
-                text = file_content.read().decode('utf-8')
-            except (UnicodeDecodeError, AttributeError):
-                try:
-                    text = file_content.decode('utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        text = file_content.decode('latin-1')
-                    except:
-                        text = file_content.decode('cp1252')
-            return text.strip()
+                text = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                text = raw.decode('latin-1')
+            return text[:max_chars].strip()
         except Exception as e:
             raise Exception(f"TXT error: {str(e)}")
-    
+
     @staticmethod
-    def process_file(file_content: bytes, file_name: str) -> str:
+    def process_file(file_content, file_name: str, parallel: bool = True) -> str:
         file_lower = file_name.lower()
         if file_lower.endswith('.pdf'):
-            return DocumentLoader.load_pdf(file_content)
+            return DocumentLoader.load_pdf(file_content, parallel=parallel)
         elif file_lower.endswith('.docx'):
             return DocumentLoader.load_docx(file_content)
         elif file_lower.endswith('.txt'):
             return DocumentLoader.load_txt(file_content)
         else:
-            raise ValueError("Unsupported format.")
\ No newline at end of file
+            raise ValueError("Unsupported format.")
+
+    @staticmethod
+    def chunk_bytes(file_bytes: bytes, file_name: str) -> List[Dict]:
+        return list(DocumentLoader.iter_chunks(io.BytesIO(file_bytes), file_name, parallel=False))
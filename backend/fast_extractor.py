@@ -0,0 +1,176 @@
+from typing import Dict, List, Optional, Tuple
+import re
+
+from skill_taxonomy import ALIAS_INDEX
+
+
+CANDIDATE_FIELDS = [
+    "full_name", "email", "phone", "years_of_experience",
+    "desired_position", "current_location", "tech_stack"
+]
+
+FILLER_WORDS = {
+    "a", "an", "and", "the", "my", "is", "am", "i", "i'm", "im", "it's", "its", "of", "in", "with",
+    "have", "has", "had", "been", "about", "around", "over", "roughly", "approximately", "total",
+    "email", "e-mail", "mail", "address", "phone", "number", "mobile", "contact", "cell", "reach",
+    "me", "at", "on", "or", "can", "you", "your", "here", "sure", "yes", "ok", "okay",
+    "year", "years", "yrs", "experience", "professional", "work", "working", "worked",
+    "know", "use", "using", "used", "familiar", "proficient", "skills", "stack", "tech", "also", "too",
+    "plus", "some", "well", "as", "both", "including", "like", "mostly", "mainly", "primarily"
+}
+
+AMBIGUOUS_ALIASES = {
+    "c", "r", "go", "express", "spring", "swift", "rust", "spark", "oracle", "elastic", "torch",
+    "ruby", "rails", "node", "react", "flask", "pandas"
+}
+MESSAGE_EXCLUDED_ALIASES = {"rest", "shell", "unix", "ts", "tf", "py", "ml"}
+MESSAGE_ALIASES = [alias for alias in ALIAS_INDEX if alias not in MESSAGE_EXCLUDED_ALIASES]
+
+WORD_NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20
+}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w@])\+?\d[\d\s().-]{6,}\d(?![\w@])")
+EXPERIENCE_RE = re.compile(
+    r"\b(\d{1,2}(?:\.\d)?|" + "|".join(WORD_NUMBERS) + r")\s*\+?\s*(?:years?|yrs?)\b",
+    re.IGNORECASE
+)
+EXPERIENCE_CUE_RE = re.compile(
+    r"\b(experience[ds]?|work(?:ed|ing)?|professional(?:ly)?|industry|career|employ\w*|"
+    r"develop(?:er|ing)|engineer(?:ing)?|coding|programming|as an?)\b",
+    re.IGNORECASE
+)
+NOT_EXPERIENCE_RE = re.compile(r"^\W*(old|ago|back|later|from now|of age)\b", re.IGNORECASE)
+TECH_CUE_RE = re.compile(
+    r"\b(tech|stack|skills?|language|framework|library|libraries|database|tools?|"
+    r"program\w*|cod(?:e|ing)|develop\w*|proficient|familiar|experience\w*|work(?:ed|ing)? (?:with|in)|"
+    r"use|using|used|know)\b",
+    re.IGNORECASE
+)
+NAME_INTRO_RE = re.compile(r"\b(name is|name's|i am|i'm|call me|this is)\s*$", re.IGNORECASE)
+EXPERIENCE_CUE_WINDOW = 40
+NEAR_MATCH_CHARS = 30
+BARE_NUMBER_RE = re.compile(r"^\s*(\d{1,2}(?:\.\d)?)\s*\+?\s*$")
+TECH_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(
+        re.escape(alias) for alias in sorted(MESSAGE_ALIASES, key=len, reverse=True)
+    ) + r")(?![\w+#]|\.\w)",
+    re.IGNORECASE
+)
+WORD_RE = re.compile(r"[a-zA-Z][a-zA-Z'-]*")
+
+
+def _parse_number(value: str):
+    value = value.lower()
+    if value in WORD_NUMBERS:
+        return WORD_NUMBERS[value]
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _blank(text: str, start: int, end: int) -> str:
+    # Keep offsets stable so spans still line up with the residual text
+    return text[:start] + " " * (end - start) + text[end:]
+
+
+def _find_experience(text: str, asked_about_experience: bool):
+    for match in EXPERIENCE_RE.finditer(text):
+        if NOT_EXPERIENCE_RE.match(text[match.end():]):
+            continue
+        window = text[max(0, match.start() - EXPERIENCE_CUE_WINDOW):match.end() + EXPERIENCE_CUE_WINDOW]
+        if asked_about_experience or EXPERIENCE_CUE_RE.search(window):
+            return match
+    return None
+
+
+def _is_name_like(text: str, match) -> bool:
+    following = text[match.end():].lstrip()
+    if following[:1].isupper() and not TECH_RE.match(following):
+        return True
+    return bool(NAME_INTRO_RE.search(text[:match.start()]))
+
+
+def extract_candidate_fields(message: str,
+                             last_assistant_message: Optional[str] = None) -> Tuple[Dict, str, Dict[str, List]]:
+    fields = {}
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    residual = message
+    last_question = (last_assistant_message or "").lower()
+
+    email = EMAIL_RE.search(residual)
+    if email:
+        fields["email"] = email.group(0)
+        spans["email"] = [email.span()]
+        residual = _blank(residual, *email.span())
+
+    for match in PHONE_RE.finditer(residual):
+        digits = re.sub(r"\D", "", match.group(0))
+        if 10 <= len(digits) <= 15:
+            fields["phone"] = match.group(0).strip()
+            spans["phone"] = [match.span()]
+            residual = _blank(residual, *match.span())
+            break
+
+    experience = _find_experience(residual, "experience" in last_question)
+    if experience:
+        fields["years_of_experience"] = _parse_number(experience.group(1))
+        spans["years_of_experience"] = [experience.span()]
+        residual = _blank(residual, *experience.span())
+    elif "experience" in last_question:
+        bare_number = BARE_NUMBER_RE.match(residual)
+        if bare_number:
+            fields["years_of_experience"] = _parse_number(bare_number.group(1))
+            spans["years_of_experience"] = [(0, len(residual))]
+            residual = " " * len(residual)
+
+    # Ambiguous aliases ("go", "spring", "ruby") only count with other evidence of a tech answer;
+    # capitalisation alone says nothing at the start of a sentence or in a name
+    matches = list(TECH_RE.finditer(residual))
+    aliases = [" ".join(match.group(1).lower().split()) for match in matches]
+    tech_context = (
+        any(alias not in AMBIGUOUS_ALIASES for alias in aliases)
+        or bool(TECH_CUE_RE.search(residual))
+        or any(cue in last_question for cue in ("tech", "stack", "programming", "framework", "tools"))
+    )
+
+    technologies = []
+    tech_spans = []
+    for match, alias in zip(matches, aliases):
+        if alias in AMBIGUOUS_ALIASES and (not tech_context or _is_name_like(residual, match)):
+            continue
+        technology = ALIAS_INDEX[alias]
+        if technology not in technologies:
+            technologies.append(technology)
+        tech_spans.append(match.span())
+    if technologies:
+        fields["tech_stack"] = technologies
+        spans["tech_stack"] = tech_spans
+        for span in tech_spans:
+            residual = _blank(residual, *span)
+
+    return fields, residual, spans
+
+
+def _content_words(text: str) -> List[str]:
+    return [word for word in WORD_RE.findall(text.lower()) if word not in FILLER_WORDS]
+
+
+def fields_needing_llm(found_fields: Dict, residual: str, spans: Optional[Dict[str, List]] = None) -> List[str]:
+    if not _content_words(residual):
+        return []
+
+    # A local match with leftover content next to it may be wrong; let the LLM confirm it
+    spans = spans or {}
+    needed = []
+    for field in CANDIDATE_FIELDS:
+        if field not in found_fields or field == "tech_stack":
+            needed.append(field)
+            continue
+        for start, end in spans.get(field, [(0, len(residual))]):
+            nearby = residual[max(0, start - NEAR_MATCH_CHARS):end + NEAR_MATCH_CHARS]
+            if _content_words(nearby):
+                needed.append(field)
+                break
+    return needed
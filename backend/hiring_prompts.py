@@ -15,7 +15,24 @@ Start by greeting the candidate professionally and clearly explaining:
 Keep your greeting professional, clear, and concise (3-4 sentences). Do not use emojis."""
 
 
-def get_info_extraction_prompt(user_message: str, conversation_history: str) -> str:
+EXTRACTION_FIELD_DESCRIPTIONS = {
+    "full_name": "The candidate's full name",
+    "email": "Email address",
+    "phone": "Phone number",
+    "years_of_experience": "Number of years of professional experience (as a number)",
+    "desired_position": "Job position(s) they're interested in",
+    "current_location": "City, state, or country where they're located",
+    "tech_stack": "List of technologies, programming languages, frameworks, databases, tools they know"
+}
+
+
+def get_info_extraction_prompt(user_message: str, conversation_history: str, fields: list = None) -> str:
+    field_lines = "\n".join(
+        f"- {field}: {description}"
+        for field, description in EXTRACTION_FIELD_DESCRIPTIONS.items()
+        if not fields or field in fields
+    )
+    
     return f"""You are an AI assistant helping to extract candidate information from a conversation.
 
 CONVERSATION HISTORY:
@@ -25,13 +42,7 @@ LATEST USER MESSAGE:
 {user_message}
 
 Extract any of the following information that is present in the user's message:
-- full_name: The candidate's full name
-- email: Email address
-- phone: Phone number
-- years_of_experience: Number of years of professional experience (as a number)
-- desired_position: Job position(s) they're interested in
-- current_location: City, state, or country where they're located
-- tech_stack: List of technologies, programming languages, frameworks, databases, tools they know
+{field_lines}
 
 Return ONLY a JSON object with the fields that were found. Use null for fields not mentioned.
 If the user is just greeting or asking questions, return an empty object {{}}.
@@ -50,41 +61,34 @@ Example output format:
 JSON OUTPUT:"""
 
 
-def get_tech_questions_prompt(tech_stack: list) -> str:
-    tech_list = ", ".join(tech_stack)
-    
-    return f"""You are a technical interviewer for TalentScout. Generate relevant technical questions to assess a candidate's proficiency.
+TECH_QUESTIONS_PROMPT_VERSION = "1"
 
-CANDIDATE'S TECH STACK: {tech_list}
 
-For each technology in the tech stack, generate 3-5 technical questions that:
-- Range from intermediate to advanced difficulty
+def get_single_tech_questions_prompt(technology: str, difficulty: str = "intermediate to advanced") -> str:
+    return f"""You are a technical interviewer for TalentScout. Generate relevant technical questions to assess a candidate's proficiency in {technology}.
+
+Generate 3-5 technical questions that:
+- Are of {difficulty} difficulty
 - Cover practical, real-world scenarios
 - Test both theoretical knowledge and practical application
-- Are specific to that technology (not generic programming questions)
+- Are specific to {technology} (not generic programming questions)
 
-Return a JSON object where each key is a technology and the value is a list of questions.
+Return a JSON object with a single key "questions" whose value is a list of questions.
 
 Example format:
 {{
-    "Python": [
+    "questions": [
         "Explain the difference between list comprehensions and generator expressions. When would you use each?",
         "How does Python's Global Interpreter Lock (GIL) affect multi-threaded applications?",
         "Describe how you would implement a decorator that caches function results."
-    ],
-    "Django": [
-        "Explain Django's ORM and how it prevents SQL injection attacks.",
-        "How would you optimize a Django application that's experiencing slow database queries?",
-        "Describe the difference between Django's select_related and prefetch_related."
     ]
 }}
 
-Generate questions for: {tech_list}
-
 JSON OUTPUT:"""
 
 
-def get_conversation_response_prompt(user_message: str, conversation_history: str, candidate_info: dict, stage: str) -> str:
+def get_conversation_response_prompt(user_message: str, conversation_history: str, candidate_info: dict, stage: str,
+                                     document_digest: str = "") -> str:
     missing_fields = []
     if not candidate_info.get("full_name"):
         missing_fields.append("full name")
@@ -115,6 +119,12 @@ COLLECTED CANDIDATE INFORMATION:
 {candidate_info}
 
 MISSING INFORMATION: {', '.join(missing_fields) if missing_fields else 'None - all information collected'}
+"""
+
+    if document_digest:
+        context += f"""
+UPLOADED DOCUMENT (answer questions about it from this summary):
+{document_digest}
 """
 
     if stage == "greeting":
@@ -155,11 +165,13 @@ RESPONSE:"""
     return context
 
 
-def get_fallback_prompt(user_message: str) -> str:
+def get_fallback_prompt(user_message: str, document_digest: str = "") -> str:
+    document_section = f"\nUPLOADED DOCUMENT:\n{document_digest}\n" if document_digest else ""
+    
     return f"""You are an AI Hiring Assistant for TalentScout. The candidate said something unexpected or off-topic.
 
 USER MESSAGE: {user_message}
-
+{document_section}
 Politely redirect the conversation back to the hiring process. Remind them that you're here to help with their job application.
 If they seem confused, briefly re-explain what information you need.
 If they're asking about the company or process, provide a brief, helpful answer and then redirect.
@@ -0,0 +1,88 @@
+from typing import Dict, Tuple
+import threading
+import os
+
+import httpx
+from langchain_groq import ChatGroq
+
+
+DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+POOL_IDLE_TIMEOUT = float(os.getenv("LLM_POOL_IDLE_TIMEOUT", "60"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+
+
+class LLMClientRegistry:
+
+    def __init__(self, pool_size: int = POOL_SIZE, idle_timeout: float = POOL_IDLE_TIMEOUT):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._clients: Dict[Tuple[str, float], ChatGroq] = {}
+        self._http_client = None
+        self._async_http_client = None
+        self._lock = threading.Lock()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.idle_timeout
+        )
+
+    def _get_http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits(), timeout=REQUEST_TIMEOUT)
+        return self._http_client
+
+    def _get_async_http_client(self) -> httpx.AsyncClient:
+        if self._async_http_client is None:
+            self._async_http_client = httpx.AsyncClient(limits=self._limits(), timeout=REQUEST_TIMEOUT)
+        return self._async_http_client
+
+    def get(self, api_key: str, model: str = DEFAULT_MODEL, temperature: float = 0) -> ChatGroq:
+        key = (model, float(temperature))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = ChatGroq(
+                    model=model,
+                    temperature=temperature,
+                    groq_api_key=api_key,
+                    groq_api_base=GROQ_BASE_URL,
+                    max_retries=0,
+                    http_client=self._get_http_client(),
+                    http_async_client=self._get_async_http_client()
+                )
+                self._clients[key] = client
+        return client
+
+    async def warm(self, api_key: str, temperatures=(0, 0.7), model: str = DEFAULT_MODEL):
+        for temperature in temperatures:
+            self.get(api_key, model=model, temperature=temperature)
+
+        try:
+            await self._get_async_http_client().get(
+                f"{GROQ_BASE_URL}/openai/v1/models",
+                headers={"Authorization": f"Bearer {api_key}"}
+            )
+        except httpx.HTTPError as e:
+            print(f"LLM connection warm-up failed: {e}")
+
+    async def aclose(self):
+        with self._lock:
+            self._clients.clear()
+            http_client, self._http_client = self._http_client, None
+            async_http_client, self._async_http_client = self._async_http_client, None
+
+        if http_client is not None:
+            http_client.close()
+        if async_http_client is not None:
+            await async_http_client.aclose()
+
+
+llm_registry = LLMClientRegistry()
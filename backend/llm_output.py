@@ -0,0 +1,245 @@
+from typing import Any, Dict, Optional
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+RESUME_SCHEMA = {
+    "personal_detail": {
+        "full_name": str,
+        "email": str,
+        "contact_no": str,
+        "gender": str,
+        "nationality": str
+    },
+    "address": {
+        "address": str,
+        "city": str,
+        "state": str,
+        "country": str,
+        "zip_code": str
+    },
+    "education": [{
+        "degree": str,
+        "school": str,
+        "start_date": str,
+        "end_date": str
+    }],
+    "experience": [{
+        "job_title": str,
+        "company_name": str,
+        "start_date": str,
+        "end_date": str,
+        "projects": str
+    }],
+    "skills": [str],
+    "certifications": [str]
+}
+
+JD_SCHEMA = {
+    "job_detail": {
+        "job_position": str,
+        "job_type": str,
+        "job_shift": str,
+        "job_industry": str,
+        "closing_date": str,
+        "min_experience": (int, float, str),
+        "max_experience": (int, float, str),
+        "no_of_openings": (int, float, str),
+        "required_education": [str],
+        "job_description": str
+    },
+    "salary_range": {
+        "min_amount": (int, float, str),
+        "max_amount": (int, float, str)
+    },
+    "job_location": {
+        "city": str,
+        "state": str,
+        "country": str,
+        "zip_code": str
+    },
+    "required_skills": [str]
+}
+
+EXTRACTION_SCHEMA = {
+    "full_name": str,
+    "email": str,
+    "phone": str,
+    "years_of_experience": (int, float, str),
+    "desired_position": str,
+    "current_location": str,
+    "tech_stack": [str]
+}
+
+TECH_QUESTIONS_SCHEMA = {
+    "questions": [str]
+}
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_WORD_RE = re.compile(r"[A-Za-z_]+")
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class LLMOutputError(ValueError):
+    pass
+
+
+def _loads(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_json_object(text: str) -> str:
+    start = text.find("{")
+    if start < 0:
+        raise LLMOutputError("No JSON object found in model output")
+
+    stack = []
+    quote = None
+    escaped = False
+    last_significant = None
+    pending_key_start = None
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+                last_significant = '"'
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            if stack[-1] == "}" and last_significant in ("{", ","):
+                pending_key_start = i
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack[-1] != ch:
+                raise LLMOutputError(f"Mismatched '{ch}' at offset {i} in model output")
+            stack.pop()
+            if not stack:
+                return text[start:i + 1]
+        elif ch == ":":
+            pending_key_start = None
+
+        if not ch.isspace():
+            last_significant = ch
+
+    # Truncated output: drop a dangling key, close the open string and brackets
+    if pending_key_start is not None:
+        fragment = text[start:pending_key_start]
+    else:
+        fragment = text[start:] + (quote or "")
+    fragment = fragment.rstrip()
+    if fragment.endswith(":"):
+        fragment += " null"
+    elif fragment.endswith(","):
+        fragment = fragment[:-1]
+    return fragment + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in "\"'":
+            chars = []
+            j = i + 1
+            while j < n and text[j] != ch:
+                c = text[j]
+                if c == "\\" and j + 1 < n:
+                    chars.append("'" if text[j + 1] == "'" else text[j:j + 2])
+                    j += 2
+                    continue
+                if c == '"':
+                    chars.append('\\"')
+                else:
+                    chars.append(_STRING_ESCAPES.get(c, c))
+                j += 1
+            out.append('"' + "".join(chars) + '"')
+            i = j + 1
+        elif ch == ",":
+            k = i + 1
+            while k < n and text[k].isspace():
+                k += 1
+            if k == n or text[k] not in "}]":
+                out.append(ch)
+            i += 1
+        elif ch.isalpha() or ch == "_":
+            word = _WORD_RE.match(text, i).group(0)
+            out.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def validate_shape(data: Any, schema: Any, path: str = "$") -> Any:
+    if data is None:
+        return None
+
+    if isinstance(schema, dict):
+        if not isinstance(data, dict):
+            raise LLMOutputError(f"{path}: expected an object, got {type(data).__name__}")
+        for key, field_schema in schema.items():
+            if key in data:
+                data[key] = validate_shape(data[key], field_schema, f"{path}.{key}")
+        return data
+
+    if isinstance(schema, list):
+        if isinstance(data, str):
+            data = [data]
+        if not isinstance(data, list):
+            raise LLMOutputError(f"{path}: expected a list, got {type(data).__name__}")
+        items = []
+        for index, item in enumerate(data):
+            try:
+                item = validate_shape(item, schema[0], f"{path}[{index}]")
+            except LLMOutputError:
+                continue
+            if item is not None:
+                items.append(item)
+        return items
+
+    if schema is str and isinstance(data, (int, float)) and not isinstance(data, bool):
+        return str(data)
+    if not isinstance(data, schema) or isinstance(data, bool):
+        raise LLMOutputError(f"{path}: unexpected {type(data).__name__} value")
+    return data
+
+
+def parse_llm_json(text: str, schema: Optional[Dict] = None) -> Dict:
+    text = text.strip()
+    try:
+        if not (text.startswith("{") and text.endswith("}")):
+            raise ValueError
+        data = _loads(text)
+    except ValueError:
+        candidate = extract_json_object(text)
+        try:
+            data = _loads(candidate)
+        except ValueError:
+            try:
+                data = _loads(repair_json(candidate))
+            except ValueError as e:
+                raise LLMOutputError(f"Could not repair model output: {e}")
+            print("Repaired malformed JSON in model output")
+
+    if schema is not None:
+        data = validate_shape(data, schema)
+    elif not isinstance(data, dict):
+        raise LLMOutputError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
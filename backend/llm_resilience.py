@@ -0,0 +1,237 @@
+from typing import Callable, Dict, List, Optional
+from email.utils import parsedate_to_datetime
+from contextlib import nullcontext
+import threading
+import asyncio
+import random
+import time
+import os
+
+import httpx
+
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "30"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+FALLBACK_MODEL = os.getenv("GROQ_FALLBACK_MODEL", "llama-3.1-8b-instant")
+FALLBACK_ACTIONS = {
+    action.strip() for action in os.getenv("LLM_FALLBACK_ACTIONS", "greet,fallback").split(",") if action.strip()
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class LLMDeadlineError(TimeoutError):
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def counts_against_breaker(error: Exception) -> bool:
+    # A 429 with Retry-After is the provider pacing us, not the model being unhealthy
+    if getattr(error, "status_code", None) == 429 and retry_after_seconds(error) is not None:
+        return False
+    return True
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_neutral(self):
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class ResilientLLM:
+
+    def __init__(self, client_factory: Callable, primary_model: str, fallback_model: Optional[str] = FALLBACK_MODEL,
+                 fallback_actions=FALLBACK_ACTIONS, limiter: Optional[asyncio.Semaphore] = None,
+                 max_retries: int = LLM_MAX_RETRIES, deadline: float = LLM_CALL_DEADLINE):
+        self.client_factory = client_factory
+        self.primary_model = primary_model
+        self.fallback_model = fallback_model
+        self.fallback_actions = fallback_actions
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = {
+            "calls": 0,
+            "retries": 0,
+            "fallbacks": 0,
+            "failures": 0,
+            "deadline_exceeded": 0,
+            "circuit_rejections": 0
+        }
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker()
+        return self._breakers[model]
+
+    def _models(self, action: Optional[str]) -> List[str]:
+        models = [self.primary_model]
+        if self.fallback_model and self.fallback_model != self.primary_model and action in self.fallback_actions:
+            models.append(self.fallback_model)
+        return models
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after_seconds(error)
+        if delay is None:
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+        return delay
+
+    async def _with_retries(self, model: str, call: Callable):
+        # The breaker sees one outcome per call, after retries, not one per attempt
+        breaker = self._breaker(model)
+        if not breaker.allow():
+            self.metrics["circuit_rejections"] += 1
+            raise CircuitOpenError(f"Circuit open for model {model}")
+
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(call(model), timeout=remaining)
+                breaker.record_success()
+                return result
+            except asyncio.TimeoutError:
+                breaker.record_failure()
+                self.metrics["deadline_exceeded"] += 1
+                raise LLMDeadlineError(f"LLM call to {model} exceeded {self.deadline:.0f}s deadline")
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.record_success()
+                    raise
+                delay = self._backoff(attempt, e)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    if counts_against_breaker(e):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_neutral()
+                    raise
+                attempt += 1
+                self.metrics["retries"] += 1
+                print(f"LLM call to {model} failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _run(self, call: Callable, action: Optional[str]):
+        self.metrics["calls"] += 1
+        models = self._models(action)
+        for index, model in enumerate(models):
+            try:
+                result = await self._with_retries(model, call)
+                if index > 0:
+                    self.metrics["fallbacks"] += 1
+                    print(f"LLM action '{action}' served by fallback model {model}")
+                return result
+            except Exception as e:
+                retryable = isinstance(e, (CircuitOpenError, LLMDeadlineError)) or is_retryable(e)
+                if not retryable or index == len(models) - 1:
+                    self.metrics["failures"] += 1
+                    raise
+
+    async def invoke(self, messages: List, temperature: float = 0, action: Optional[str] = None):
+        async def call(model: str):
+            llm = self.client_factory(model=model, temperature=temperature)
+            return await llm.ainvoke(messages)
+
+        # The deadline starts once a slot is held, so local queueing never counts as a model failure
+        async with self.limiter or nullcontext():
+            return await self._run(call, action)
+
+    async def stream(self, messages: List, temperature: float = 0.7, action: Optional[str] = None):
+        # Retries and fallback only apply until the first chunk arrives
+        async def call(model: str):
+            llm = self.client_factory(model=model, temperature=temperature)
+            chunks = llm.astream(messages)
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = None
+            return first, chunks
+
+        async with self.limiter or nullcontext():
+            first, chunks = await self._run(call, action)
+            if first is not None:
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+
+    def stats(self) -> Dict:
+        return {
+            **self.metrics,
+            "breakers": {model: breaker.state for model, breaker in self._breakers.items()}
+        }
@@ -1,22 +1,44 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, BinaryIO
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import asyncio
 import json
 import base64
 import io
 import os
+import time
+import zipfile
 
-from document_loader import DocumentLoader
-from template_prompt import get_resume_prompt, get_jd_prompt
+from document_loader import DocumentLoader, SUPPORTED_EXTENSIONS, shutdown_pdf_pool
+from llm_client import llm_registry, DEFAULT_MODEL
+from llm_resilience import ResilientLLM, CircuitOpenError, LLMDeadlineError
+from template_prompt import get_resume_prompt, get_jd_prompt, PROMPT_VERSION
+from parse_cache import ParseCache, parse_cache
+from resume_compressor import compress_resume_chunks, RESUME_TOKEN_BUDGET
+from llm_output import (
+    LLMOutputError,
+    parse_llm_json,
+    RESUME_SCHEMA,
+    JD_SCHEMA,
+    EXTRACTION_SCHEMA,
+    TECH_QUESTIONS_SCHEMA
+)
 from conversation_manager import ConversationManager, ConversationState
+from session_store import create_session_store, new_session_id
+from fast_extractor import extract_candidate_fields, fields_needing_llm
+from skill_taxonomy import lookup_skill, normalize_skill, normalize_skills
+from question_bank import QuestionBank, QuestionMemo, question_bank, question_memo
 from hiring_prompts import (
     get_greeting_prompt, 
     get_info_extraction_prompt,
-    get_tech_questions_prompt,
+    get_single_tech_questions_prompt,
+    TECH_QUESTIONS_PROMPT_VERSION,
     get_conversation_response_prompt,
     get_fallback_prompt,
     detect_conversation_ending,
@@ -26,6 +48,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 api_key = os.getenv("GROQ_API_KEY")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "sequential")
+QUESTION_DIFFICULTY = os.getenv("QUESTION_DIFFICULTY", "intermediate to advanced")
+QUESTION_VARIANT = QuestionBank.make_variant(QUESTION_DIFFICULTY, TECH_QUESTIONS_PROMPT_VERSION)
+session_store = create_session_store()
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+BATCH_EXTRACTION_WORKERS = int(os.getenv("BATCH_EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.getenv("BATCH_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("BATCH_MAX_TOTAL_BYTES", str(200 * 1024 * 1024)))
+extraction_pool = None
+
 app = FastAPI(
     title="TalentScout Assistant API",
     version="1.0.0"
@@ -43,188 +78,385 @@ app.add_middleware(
 class FileInput(BaseModel):
     fileName: str
     fileContent: str  
+    bypassCache: bool = False
 
 
 class ChatRequest(BaseModel):
     message: str
     conversation_state: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
+    use_session: bool = False
+    document_context: Optional[Dict[str, Any]] = None
+    encoded_state: Optional[str] = None
+    state_format: str = "json"
 
 
 class ChatResponse(BaseModel):
     response: str
-    conversation_state: Dict[str, Any]
+    conversation_state: Optional[Dict[str, Any]] = None
+    encoded_state: Optional[str] = None
+    session_id: Optional[str] = None
     candidate_info: Optional[Dict[str, Any]] = None
     tech_questions: Optional[Dict[str, Any]] = None
     stage: str
     conversation_ended: bool = False
 
 
-def get_llm(temperature: float = 0):
+def get_llm(temperature: float = 0, model: str = DEFAULT_MODEL):
     if not api_key:
         raise ValueError("GROQ_API_KEY environment variable not set")
     
-    return ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=temperature,
-        groq_api_key=api_key
-    )
+    return llm_registry.get(api_key, model=model, temperature=temperature)
+
+
+llm_caller = ResilientLLM(get_llm, DEFAULT_MODEL, limiter=llm_semaphore)
+
+
+def llm_error_status(error: Exception) -> int:
+    if isinstance(error, CircuitOpenError):
+        return 503
+    if isinstance(error, LLMDeadlineError):
+        return 504
+    return 500
+
+
+@app.on_event("startup")
+async def warm_llm_clients():
+    if api_key:
+        await llm_registry.warm(api_key)
+
 
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_registry.aclose()
 
-def parse_with_llm(text: str, prompt: str) -> dict:
+
+@app.on_event("shutdown")
+async def close_extraction_pool():
+    if extraction_pool is not None:
+        extraction_pool.shutdown(wait=False, cancel_futures=True)
+    shutdown_pdf_pool()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global extraction_pool
+    if extraction_pool is None:
+        extraction_pool = ProcessPoolExecutor(max_workers=BATCH_EXTRACTION_WORKERS)
+    return extraction_pool
+
+
+async def invoke_llm(prompt: str, temperature: float = 0, action: Optional[str] = None):
+    messages = [HumanMessage(content=prompt)]
+    return await llm_caller.invoke(messages, temperature=temperature, action=action)
+
+
+async def parse_with_llm(text: str, prompt: str, schema: Optional[Dict] = None) -> dict:
     try:
-        llm = get_llm()
-        messages = [HumanMessage(content=prompt)]
-        response = llm.invoke(messages)
-        response_text = response.content.strip()
-        
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
+        response = await invoke_llm(prompt)
+        return parse_llm_json(response.content, schema)
         
-        response_text = response_text.strip()
-        return json.loads(response_text)
-        
-    except json.JSONDecodeError as e:
+    except LLMOutputError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to parse response: {str(e)}"
         )
     except Exception as e:
         raise HTTPException(
-            status_code=500,
+            status_code=llm_error_status(e),
             detail=f"Error processing: {str(e)}"
         )
 
 
-def get_llm_response(prompt: str, temperature: float = 0.7) -> str:
+async def get_llm_response(prompt: str, temperature: float = 0.7, action: Optional[str] = None) -> str:
     try:
-        llm = get_llm(temperature=temperature)
-        messages = [HumanMessage(content=prompt)]
-        response = llm.invoke(messages)
+        response = await invoke_llm(prompt, temperature=temperature, action=action)
         return response.content.strip()
     except Exception as e:
         raise HTTPException(
-            status_code=500,
+            status_code=llm_error_status(e),
             detail=f"Error getting response: {str(e)}"
         )
 
 
+async def stream_llm_response(prompt: str, temperature: float = 0.7, action: Optional[str] = None):
+    messages = [HumanMessage(content=prompt)]
+    async for chunk in llm_caller.stream(messages, temperature=temperature, action=action):
+        if chunk.content:
+            yield chunk.content
+
+
 @app.get("/")
 async def root():
     return {
         "status": "online",
-        "endpoints": ["/chat/hiring", "/parse/resume", "/parse/jd"]
+        "endpoints": [
+            "/chat/hiring",
+            "/chat/hiring/stream",
+            "/sessions/{session_id}",
+            "/parse/resume",
+            "/parse/resume/upload",
+            "/parse/resume/batch",
+            "/parse/jd",
+            "/parse/jd/upload",
+            "/cache/stats",
+            "/llm/stats"
+        ]
     }
 
 
-@app.post("/chat/hiring", response_model=ChatResponse)
-async def chat_hiring(request: ChatRequest):
+class TurnPlan:
+
+    def __init__(self, action: str, text: str = "", prompt: Optional[str] = None,
+                 temperature: float = 0.7, ended: bool = False, pending: Optional[List] = None):
+        self.action = action
+        self.text = text
+        self.prompt = prompt
+        self.temperature = temperature
+        self.ended = ended
+        self.pending = pending or []
+        self.started_at = time.perf_counter()
+    
+    def cancel_pending(self):
+        for task in self.pending:
+            task.cancel()
+
+
+async def load_conversation_state(request: ChatRequest) -> Tuple[ConversationState, Optional[str]]:
+    if request.session_id:
+        stored_state = await run_in_threadpool(session_store.get, request.session_id)
+        if stored_state is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        return ConversationManager.restore_conversation(stored_state), request.session_id
+    
+    # With use_session, a client-held state seeds the new session (e.g. after the old one expired)
+    session_id = new_session_id() if request.use_session else None
+    if request.encoded_state:
+        try:
+            encoded_state = base64.b64decode(request.encoded_state)
+            return ConversationManager.restore_conversation(encoded_state, trusted=False), session_id
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid encoded_state: {str(e)}")
+    if request.conversation_state:
+        return ConversationManager.restore_conversation(request.conversation_state), session_id
+    return ConversationManager.initialize_conversation(), session_id
+
+
+async def extract_candidate_info(state: ConversationState, user_message: str, history_text: str,
+                                 fields: Optional[List[str]] = None, local_guesses: Optional[Dict] = None):
+    extraction_prompt = get_info_extraction_prompt(user_message, history_text, fields)
+    extracted_info = {}
+    
     try:
-        if request.conversation_state:
-            state = ConversationManager.restore_conversation(request.conversation_state)
+        extracted_info = await parse_with_llm(user_message, extraction_prompt, EXTRACTION_SCHEMA) or {}
+    except Exception as e:
+        print(f"Extraction error: {e}")
+    
+    # Local matches the LLM was asked to confirm only fill in what it left empty
+    for field, value in (local_guesses or {}).items():
+        if not extracted_info.get(field):
+            extracted_info[field] = value
+    if extracted_info:
+        state.update_candidate_info(extracted_info)
+
+
+def lookup_tech_questions(tech_stack: List[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+    covered, missing = question_bank.lookup(tech_stack, QUESTION_VARIANT)
+    
+    # The bank only keeps taxonomy skills; the memo holds recent generations for anything else
+    unmemoized = []
+    for tech in missing:
+        memo_key = QuestionMemo.make_key(tech, QUESTION_DIFFICULTY, TECH_QUESTIONS_PROMPT_VERSION)
+        questions = question_memo.get(memo_key)
+        if questions is not None:
+            covered[tech] = questions
         else:
-            state = ConversationManager.initialize_conversation()
+            unmemoized.append(tech)
+    return covered, unmemoized
+
+
+async def generate_tech_questions(technology: str) -> List[str]:
+    questions_prompt = get_single_tech_questions_prompt(technology, QUESTION_DIFFICULTY)
+    result = await parse_with_llm("", questions_prompt, TECH_QUESTIONS_SCHEMA)
+    questions = [q for q in result.get("questions") or [] if q.strip()]
+    
+    if questions and lookup_skill(technology) is None:
+        question_memo.put(
+            QuestionMemo.make_key(technology, QUESTION_DIFFICULTY, TECH_QUESTIONS_PROMPT_VERSION), questions
+        )
+    return questions
+
+
+async def plan_turn(state: ConversationState, user_message: str) -> TurnPlan:
+    state.add_message("user", user_message)
+    state.refresh_history_summary()
+    
+    if detect_conversation_ending(user_message):
+        state.stage = "conclusion"
+        return TurnPlan(
+            "end",
+            text=get_conclusion_message(state.candidate_info.get("full_name")),
+            ended=True
+        )
+    
+    action = ConversationManager.determine_next_action(state, user_message)
+    
+    if action == "greet":
+        state.stage = "info_gathering"
+        state.advance_stage()
+        return TurnPlan(action, prompt=get_greeting_prompt())
+    
+    if action == "extract_info":
+        local_info, residual, spans = extract_candidate_fields(user_message, state.get_last_assistant_message())
+        llm_fields = fields_needing_llm(local_info, residual, spans)
+        confident = {field: value for field, value in local_info.items() if field not in llm_fields}
+        local_guesses = {field: value for field, value in local_info.items() if field in llm_fields}
+        if confident:
+            state.update_candidate_info(confident)
+        history_text = state.get_conversation_history_text()
         
-        user_message = request.message.strip()
-        state.add_message("user", user_message)
+        if not llm_fields:
+            return TurnPlan(action, prompt=get_conversation_response_prompt(
+                user_message,
+                history_text,
+                state.candidate_info,
+                state.stage,
+                state.get_document_digest()
+            ))
         
-        if detect_conversation_ending(user_message):
-            conclusion_msg = get_conclusion_message(state.candidate_info.get("full_name"))
-            state.add_message("assistant", conclusion_msg)
-            state.stage = "conclusion"
-            
-            return ChatResponse(
-                response=conclusion_msg,
-                conversation_state=state.to_dict(),
-                candidate_info=state.candidate_info,
-                tech_questions=state.tech_questions,
-                stage=state.stage,
-                conversation_ended=True
+        if EXTRACTION_MODE == "pipelined":
+            extraction = asyncio.create_task(
+                extract_candidate_info(state, user_message, history_text, llm_fields, local_guesses)
             )
+            return TurnPlan(action, prompt=get_conversation_response_prompt(
+                user_message,
+                history_text,
+                state.candidate_info,
+                state.stage,
+                state.get_document_digest()
+            ), pending=[extraction])
         
-        action = ConversationManager.determine_next_action(state, user_message)
-        assistant_response = ""
+        await extract_candidate_info(state, user_message, history_text, llm_fields, local_guesses)
         
-        if action == "greet":
-            greeting_prompt = get_greeting_prompt()
-            assistant_response = get_llm_response(greeting_prompt, temperature=0.7)
-            state.stage = "info_gathering"
-            state.advance_stage()
+        return TurnPlan(action, prompt=get_conversation_response_prompt(
+            user_message,
+            state.get_conversation_history_text(),
+            state.candidate_info,
+            state.stage,
+            state.get_document_digest()
+        ))
+    
+    if action == "generate_questions":
+        tech_stack = state.candidate_info.get("tech_stack", [])
         
-        elif action == "extract_info":
-            extraction_prompt = get_info_extraction_prompt(
-                user_message, 
-                state.get_conversation_history_text()
-            )
-            
-            try:
-                extracted_info = parse_with_llm(user_message, extraction_prompt)
-                if extracted_info:
-                    state.update_candidate_info(extracted_info)
-            except Exception as e:
-                print(f"Extraction error: {e}")
-            
-            response_prompt = get_conversation_response_prompt(
-                user_message,
-                state.get_conversation_history_text(),
-                state.candidate_info,
-                state.stage
-            )
-            assistant_response = get_llm_response(response_prompt, temperature=0.7)
+        if not tech_stack:
+            return TurnPlan(action, text="Could you list your tech stack?")
         
-        elif action == "generate_questions":
-            tech_stack = state.candidate_info.get("tech_stack", [])
-            
-            if tech_stack:
-                questions_prompt = get_tech_questions_prompt(tech_stack)
-                
-                try:
-                    tech_questions = parse_with_llm("", questions_prompt)
-                    state.set_tech_questions(tech_questions)
-                    
-                    assistant_response = f"I've prepared some technical questions for your skills in {', '.join(tech_stack)}.\n\n"
-                    assistant_response += ConversationManager.format_tech_questions_display(tech_questions)
-                    
-                    state.stage = "tech_questions"
-                    
-                except Exception as e:
-                    assistant_response = "I'll prepare some questions for you shortly."
-                    print(f"Generation error: {e}")
-            else:
-                assistant_response = "Could you list your tech stack?"
+        covered, missing = lookup_tech_questions(tech_stack)
+        results = await asyncio.gather(
+            *(generate_tech_questions(tech) for tech in missing),
+            return_exceptions=True
+        )
         
-        elif action == "respond":
-            response_prompt = get_conversation_response_prompt(
-                user_message,
-                state.get_conversation_history_text(),
-                state.candidate_info,
-                state.stage
-            )
-            assistant_response = get_llm_response(response_prompt, temperature=0.7)
+        generated = {}
+        for tech, result in zip(missing, results):
+            if isinstance(result, Exception):
+                print(f"Generation error for {tech}: {result}")
+            elif result:
+                generated[tech] = result
+        if generated:
+            await run_in_threadpool(question_bank.learn, generated, QUESTION_VARIANT)
         
-        elif action == "conclude":
-            conclusion_msg = get_conclusion_message(state.candidate_info.get("full_name"))
-            assistant_response = conclusion_msg
-            state.stage = "conclusion"
+        tech_questions = {}
+        for tech in tech_stack:
+            canonical = normalize_skill(tech)
+            questions = covered.get(canonical) or generated.get(canonical)
+            if questions:
+                tech_questions[canonical] = questions
         
-        else:
-            fallback_prompt = get_fallback_prompt(user_message)
-            assistant_response = get_llm_response(fallback_prompt, temperature=0.7)
+        if not tech_questions:
+            return TurnPlan(action, text="I'll prepare some questions for you shortly.")
         
-        state.add_message("assistant", assistant_response)
+        state.set_tech_questions(tech_questions)
         
-        return ChatResponse(
-            response=assistant_response,
-            conversation_state=state.to_dict(),
-            candidate_info=state.candidate_info,
-            tech_questions=state.tech_questions,
-            stage=state.stage,
-            conversation_ended=(state.stage == "conclusion")
-        )
+        response_text = f"I've prepared some technical questions for your skills in {', '.join(tech_stack)}.\n\n"
+        response_text += ConversationManager.format_tech_questions_display(tech_questions)
+        
+        state.stage = "tech_questions"
+        return TurnPlan(action, text=response_text)
+    
+    if action == "respond":
+        return TurnPlan(action, prompt=get_conversation_response_prompt(
+            user_message,
+            state.get_conversation_history_text(),
+            state.candidate_info,
+            state.stage,
+            state.get_document_digest()
+        ))
+    
+    if action == "conclude":
+        state.stage = "conclusion"
+        return TurnPlan(action, text=get_conclusion_message(state.candidate_info.get("full_name")))
+    
+    return TurnPlan("fallback", prompt=get_fallback_prompt(user_message, state.get_document_digest()))
+
+
+async def finish_turn(state: ConversationState, plan: TurnPlan, assistant_response: str,
+                      session_id: Optional[str] = None, state_format: str = "json") -> ChatResponse:
+    if plan.pending:
+        await asyncio.gather(*plan.pending)
+    
+    state.add_message("assistant", assistant_response)
+    
+    elapsed_ms = (time.perf_counter() - plan.started_at) * 1000
+    print(f"Turn '{plan.action}' completed in {elapsed_ms:.0f} ms")
+    
+    conversation_state = None
+    encoded_state = None
+    if session_id:
+        await run_in_threadpool(session_store.put, session_id, ConversationManager.serialize_conversation(state))
+    elif state_format == "compact":
+        encoded_state = base64.b64encode(
+            ConversationManager.serialize_conversation(state, compress=False)
+        ).decode("ascii")
+    else:
+        conversation_state = state.to_dict()
+    
+    return ChatResponse(
+        response=assistant_response,
+        conversation_state=conversation_state,
+        encoded_state=encoded_state,
+        session_id=session_id,
+        candidate_info=state.candidate_info,
+        tech_questions=state.tech_questions,
+        stage=state.stage,
+        conversation_ended=plan.ended or state.stage == "conclusion"
+    )
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/hiring", response_model=ChatResponse)
+async def chat_hiring(request: ChatRequest):
+    try:
+        state, session_id = await load_conversation_state(request)
+        if request.document_context:
+            state.set_document_context(request.document_context)
+        plan = await plan_turn(state, request.message.strip())
         
+        try:
+            if plan.prompt:
+                assistant_response = await get_llm_response(plan.prompt, temperature=plan.temperature, action=plan.action)
+            else:
+                assistant_response = plan.text
+            
+            return await finish_turn(state, plan, assistant_response, session_id, request.state_format)
+        finally:
+            plan.cancel_pending()
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -232,46 +464,278 @@ async def chat_hiring(request: ChatRequest):
         )
 
 
+@app.post("/chat/hiring/stream")
+async def chat_hiring_stream(request: ChatRequest):
+    try:
+        state, session_id = await load_conversation_state(request)
+        if request.document_context:
+            state.set_document_context(request.document_context)
+        plan = await plan_turn(state, request.message.strip())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error: {str(e)}"
+        )
+    
+    async def event_stream():
+        try:
+            if plan.prompt:
+                tokens = []
+                async for token in stream_llm_response(plan.prompt, temperature=plan.temperature, action=plan.action):
+                    tokens.append(token)
+                    yield format_sse_event("token", {"token": token})
+                assistant_response = "".join(tokens).strip()
+            else:
+                assistant_response = plan.text
+                yield format_sse_event("token", {"token": assistant_response})
+            
+            chat_response = await finish_turn(state, plan, assistant_response, session_id, request.state_format)
+            yield format_sse_event("done", chat_response.model_dump())
+            
+        except Exception as e:
+            yield format_sse_event("error", {"detail": f"Error: {str(e)}"})
+        finally:
+            plan.cancel_pending()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    await run_in_threadpool(session_store.delete, session_id)
+    return {"status": "deleted", "session_id": session_id}
+
+
+PARSE_PROMPTS = {
+    "resume": get_resume_prompt,
+    "jd": get_jd_prompt
+}
+
+PARSE_SCHEMAS = {
+    "resume": RESUME_SCHEMA,
+    "jd": JD_SCHEMA
+}
+
+
+async def parse_document(file_stream: BinaryIO, file_name: str, kind: str, bypass_cache: bool = False,
+                         executor: Optional[ProcessPoolExecutor] = None,
+                         llm_limiter: Optional[asyncio.Semaphore] = None) -> dict:
+    cache_key = None
+    if parse_cache is not None:
+        digest = await run_in_threadpool(ParseCache.hash_stream, file_stream)
+        # The resume budget changes what the LLM sees, so it is part of the cache version
+        cache_version = f"{PROMPT_VERSION}.{RESUME_TOKEN_BUDGET}" if kind == "resume" else PROMPT_VERSION
+        cache_key = ParseCache.make_key(digest, kind, cache_version)
+        if not bypass_cache:
+            cached = await run_in_threadpool(parse_cache.get, cache_key)
+            if cached is not None:
+                return cached
+    
+    if executor is not None:
+        loop = asyncio.get_running_loop()
+        file_bytes = await run_in_threadpool(file_stream.read)
+        chunks = await loop.run_in_executor(executor, DocumentLoader.chunk_bytes, file_bytes, file_name)
+    else:
+        chunks = []
+        async for chunk in iterate_in_threadpool(DocumentLoader.iter_chunks(file_stream, file_name)):
+            chunks.append(chunk)
+    
+    compression_stats = None
+    if kind == "resume":
+        text, compression_stats = compress_resume_chunks(chunks)
+    else:
+        text = DocumentLoader.chunks_to_text(chunks)
+    
+    if not text:
+        raise HTTPException(
+            status_code=400,
+            detail="Empty text"
+        )
+    
+    prompt = PARSE_PROMPTS[kind](text)
+    async with llm_limiter or nullcontext():
+        llm_started_at = time.perf_counter()
+        parsed_data = await parse_with_llm(text, prompt, PARSE_SCHEMAS[kind])
+        llm_ms = (time.perf_counter() - llm_started_at) * 1000
+    
+    if kind == "resume" and isinstance(parsed_data, dict) and "skills" in parsed_data:
+        parsed_data["skills"] = normalize_skills(parsed_data["skills"])
+    if kind == "jd" and isinstance(parsed_data, dict) and "required_skills" in parsed_data:
+        parsed_data["required_skills"] = normalize_skills(parsed_data["required_skills"])
+    
+    if compression_stats:
+        print(
+            f"Resume '{file_name}': {compression_stats['original_tokens']} -> "
+            f"{compression_stats['compressed_tokens']} tokens "
+            f"({compression_stats['tokens_saved']} saved), LLM parse took {llm_ms:.0f} ms"
+        )
+    
+    if cache_key is not None:
+        await run_in_threadpool(parse_cache.put, cache_key, parsed_data)
+    return parsed_data
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    if parse_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **parse_cache.stats()}
+
+
+@app.get("/llm/stats")
+async def llm_stats():
+    return llm_caller.stats()
+
+
 @app.post("/parse/resume")
 async def parse_resume(file_input: FileInput):
     try:
-        file_bytes = base64.b64decode(file_input.fileContent)
-        file_stream = io.BytesIO(file_bytes)
-        text = DocumentLoader.process_file(file_stream, file_input.fileName)
-        
-        if not text:
-            raise HTTPException(
-                status_code=400,
-                detail="Empty text"
-            )
-        
-        prompt = get_resume_prompt(text)
-        parsed_data = parse_with_llm(text, prompt)
+        file_stream = io.BytesIO(base64.b64decode(file_input.fileContent))
+        parsed_data = await parse_document(file_stream, file_input.fileName, "resume", file_input.bypassCache)
         return JSONResponse(content=parsed_data)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+def expand_batch_files(uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, bytes]]:
+    files = []
+    total_bytes = 0
+    for file_name, file_bytes in uploads:
+        if not file_name.lower().endswith(".zip"):
+            files.append((file_name, file_bytes))
+            total_bytes += len(file_bytes)
+            continue
+        
+        with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir()
+                and not os.path.basename(info.filename).startswith(".")
+                and info.filename.lower().endswith(SUPPORTED_EXTENSIONS)
+            ]
+            
+            # Check declared sizes before decompressing anything, so a zip bomb is rejected up front
+            if len(files) + len(members) > BATCH_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Too many files (max {BATCH_MAX_FILES})")
+            for info in members:
+                if info.file_size > BATCH_MAX_FILE_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"'{info.filename}' exceeds {BATCH_MAX_FILE_BYTES} bytes uncompressed"
+                    )
+                total_bytes += info.file_size
+            if total_bytes > BATCH_MAX_TOTAL_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Batch exceeds {BATCH_MAX_TOTAL_BYTES} bytes uncompressed"
+                )
+            
+            for info in members:
+                with archive.open(info) as member:
+                    data = member.read(info.file_size + 1)
+                if len(data) != info.file_size:
+                    raise zipfile.BadZipFile(f"Size mismatch for '{info.filename}'")
+                files.append((os.path.basename(info.filename), data))
+    return files
+
+
+async def parse_batch_item(index: int, file_name: str, file_bytes: bytes, bypass_cache: bool,
+                           llm_limiter: asyncio.Semaphore) -> Dict[str, Any]:
+    try:
+        parsed_data = await parse_document(
+            io.BytesIO(file_bytes), file_name, "resume", bypass_cache,
+            executor=get_extraction_pool(),
+            llm_limiter=llm_limiter
+        )
+        return {"index": index, "fileName": file_name, "data": parsed_data, "error": None}
+    except HTTPException as e:
+        return {"index": index, "fileName": file_name, "data": None, "error": e.detail}
+    except Exception as e:
+        return {"index": index, "fileName": file_name, "data": None, "error": str(e)}
+
+
+@app.post("/parse/resume/batch")
+async def parse_resume_batch(files: List[UploadFile] = File(...), bypassCache: bool = False):
+    try:
+        uploads = [(upload.filename or f"file-{i}", await upload.read()) for i, upload in enumerate(files)]
+        batch = expand_batch_files(uploads)
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {str(e)}")
+    
+    if not batch:
+        raise HTTPException(status_code=400, detail="No files provided")
+    if len(batch) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files (max {BATCH_MAX_FILES})")
+    
+    async def result_stream():
+        started_at = time.perf_counter()
+        llm_limiter = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(parse_batch_item(i, file_name, file_bytes, bypassCache, llm_limiter))
+            for i, (file_name, file_bytes) in enumerate(batch)
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        elapsed = time.perf_counter() - started_at
+        print(f"Batch of {len(batch)} resumes parsed in {elapsed:.1f}s ({len(batch) / elapsed * 60:.1f}/min)")
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
 @app.post("/parse/jd")
 async def parse_jd(file_input: FileInput):
     try:
-        file_bytes = base64.b64decode(file_input.fileContent)
-        file_stream = io.BytesIO(file_bytes)
-        text = DocumentLoader.process_file(file_stream, file_input.fileName)
+        file_stream = io.BytesIO(base64.b64decode(file_input.fileContent))
+        parsed_data = await parse_document(file_stream, file_input.fileName, "jd", file_input.bypassCache)
+        return JSONResponse(content=parsed_data)
         
-        if not text:
-            raise HTTPException(
-                status_code=400,
-                detail="Empty text"
-            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.post("/parse/resume/upload")
+async def parse_resume_upload(file: UploadFile = File(...), bypassCache: bool = False):
+    try:
+        parsed_data = await parse_document(file.file, file.filename or "", "resume", bypassCache)
+        return JSONResponse(content=parsed_data)
         
-        prompt = get_jd_prompt(text)
-        parsed_data = parse_with_llm(text, prompt)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.post("/parse/jd/upload")
+async def parse_jd_upload(file: UploadFile = File(...), bypassCache: bool = False):
+    try:
+        parsed_data = await parse_document(file.file, file.filename or "", "jd", bypassCache)
         return JSONResponse(content=parsed_data)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
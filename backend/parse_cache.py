@@ -0,0 +1,156 @@
+from typing import BinaryIO, Dict, Optional
+from collections import OrderedDict
+import threading
+import hashlib
+import json
+import os
+
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_MEMORY_BYTES = int(os.getenv("PARSE_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+PARSE_CACHE_DISK_BYTES = int(os.getenv("PARSE_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", ".parse_cache")
+
+
+class ParseCache:
+
+    def __init__(self, max_memory_bytes: int = PARSE_CACHE_MEMORY_BYTES,
+                 cache_dir: Optional[str] = PARSE_CACHE_DIR,
+                 max_disk_bytes: int = PARSE_CACHE_DISK_BYTES):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = cache_dir
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def hash_stream(file_stream: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        file_stream.seek(0)
+        for chunk in iter(lambda: file_stream.read(chunk_size), b""):
+            digest.update(chunk)
+        file_stream.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(digest: str, kind: str, prompt_version: str) -> str:
+        return f"{kind}-{prompt_version}-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key: str, value: Dict, size: int):
+        if size > self.max_memory_bytes:
+            return
+
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[0]
+
+            if key not in self._disk:
+                self.counters["misses"] += 1
+                return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                payload = f.read()
+            value = json.loads(payload)
+        except (OSError, ValueError) as e:
+            print(f"Parse cache read error: {e}")
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+                self.counters["misses"] += 1
+            return None
+
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self.counters["disk_hits"] += 1
+            self._remember(key, value, len(payload))
+        return value
+
+    def put(self, key: str, value: Dict):
+        payload = json.dumps(value).encode("utf-8")
+
+        with self._lock:
+            self._remember(key, value, len(payload))
+
+        if not self.cache_dir or len(payload) > self.max_disk_bytes:
+            return
+
+        try:
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Parse cache write error: {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(payload)
+            self._disk_bytes += len(payload)
+            while self._disk_bytes > self.max_disk_bytes:
+                evicted_key, evicted_size = self._disk.popitem(last=False)
+                self._disk_bytes -= evicted_size
+                self.counters["evictions"] += 1
+                evicted.append(evicted_key)
+
+        for evicted_key in evicted:
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+parse_cache = ParseCache() if PARSE_CACHE_ENABLED else None
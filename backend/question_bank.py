@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+import json
+import os
+
+from skill_taxonomy import lookup_skill, normalize_skill
+
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTION_BANK_SEED_PATH = os.path.join(_DIR, "question_bank.json")
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "question_bank_learned.json")
+QUESTIONS_PER_TECH = int(os.getenv("QUESTIONS_PER_TECH", "5"))
+QUESTION_MEMO_SIZE = int(os.getenv("QUESTION_MEMO_SIZE", "512"))
+QUESTION_MEMO_TTL = float(os.getenv("QUESTION_MEMO_TTL", "86400"))
+
+
+class QuestionBank:
+
+    def __init__(self, seed_path: str = QUESTION_BANK_SEED_PATH, learned_path: str = QUESTION_BANK_PATH):
+        self.learned_path = learned_path
+        self._seed: Dict[str, List[str]] = {}
+        # Learned sets depend on how they were generated: {variant: {tech: questions}}
+        self._learned: Dict[str, Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+
+        for tech, questions in self._read_questions(self._read(seed_path)).items():
+            self._seed[tech.lower()] = questions
+        if learned_path:
+            for variant, questions_by_tech in self._read(learned_path).items():
+                if not isinstance(questions_by_tech, dict):
+                    print(f"Question bank: ignoring learned entry '{variant}' without difficulty/prompt version")
+                    continue
+                # Entries learned before only taxonomy skills were kept are dropped on the next write
+                self._learned[variant] = {
+                    tech: questions for tech, questions in self._read_questions(questions_by_tech).items()
+                    if lookup_skill(tech)
+                }
+
+    @staticmethod
+    def make_variant(difficulty: str, prompt_version: str) -> str:
+        return f"{difficulty}|v{prompt_version}"
+
+    @staticmethod
+    def _read(path: str) -> Dict:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Question bank read error ({path}): {e}")
+            return {}
+
+    @staticmethod
+    def _read_questions(data: Dict) -> Dict[str, List[str]]:
+        return {
+            normalize_skill(tech): [q for q in questions if isinstance(q, str)]
+            for tech, questions in data.items()
+            if isinstance(questions, list)
+        }
+
+    def lookup(self, tech_stack: List[str], variant: str) -> Tuple[Dict[str, List[str]], List[str]]:
+        learned = self._learned.get(variant, {})
+        covered = {}
+        missing = []
+        for tech in tech_stack:
+            canonical = normalize_skill(tech)
+            questions = self._seed.get(canonical.lower()) or learned.get(canonical)
+            if questions:
+                covered[canonical] = questions[:QUESTIONS_PER_TECH]
+            elif canonical not in missing:
+                missing.append(canonical)
+        return covered, missing
+
+    def learn(self, generated: Dict[str, List[str]], variant: str) -> Dict[str, List[str]]:
+        learned = {}
+        added = False
+        with self._lock:
+            learned_for_variant = self._learned.setdefault(variant, {})
+            for tech, questions in generated.items():
+                if not isinstance(questions, list):
+                    continue
+                questions = [q for q in questions if isinstance(q, str) and q.strip()]
+                if not questions:
+                    continue
+                canonical = normalize_skill(tech)
+                learned[canonical] = questions
+                # tech_stack comes from user text; only known skills earn a permanent entry
+                if lookup_skill(tech) is None:
+                    continue
+                if canonical.lower() not in self._seed and canonical not in learned_for_variant:
+                    learned_for_variant[canonical] = questions
+                    added = True
+
+            if added and self.learned_path:
+                self._persist()
+        return learned
+
+    def _persist(self):
+        try:
+            tmp_path = self.learned_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._learned, f, indent=4)
+            os.replace(tmp_path, self.learned_path)
+        except OSError as e:
+            print(f"Question bank write error: {e}")
+
+
+class QuestionMemo:
+
+    def __init__(self, max_entries: int = QUESTION_MEMO_SIZE, ttl: float = QUESTION_MEMO_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(technology: str, difficulty: str, prompt_version: str) -> tuple:
+        return (normalize_skill(technology).lower(), difficulty, prompt_version)
+
+    def get(self, key: tuple) -> Optional[List[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            questions, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return questions
+
+    def put(self, key: tuple, questions: List[str]):
+        with self._lock:
+            self._entries[key] = (questions, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+question_bank = QuestionBank()
+question_memo = QuestionMemo()
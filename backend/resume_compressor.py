@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import re
+import os
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
+BOILERPLATE_EDGE_LINES = int(os.getenv("BOILERPLATE_EDGE_LINES", "2"))
+
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+SECTION_PRIORITIES = [
+    (0, ("contact", "personal")),
+    (1, ("skill", "technolog", "tech stack", "competenc")),
+    (2, ("experience", "employment", "work history")),
+    (3, ("education", "academic", "qualification")),
+    (4, ("certific", "licens")),
+    (5, ("project",)),
+    (6, ("summary", "profile", "objective", "about")),
+    (9, ("reference", "hobb", "interest")),
+]
+DEFAULT_SECTION_PRIORITY = 7
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def section_priority(section: Optional[str]) -> int:
+    if section is None:
+        return 0
+    for priority, keywords in SECTION_PRIORITIES:
+        if any(keyword in section for keyword in keywords):
+            return priority
+    return DEFAULT_SECTION_PRIORITY
+
+
+def strip_page_boilerplate(chunks: Iterable[Dict]) -> Tuple[List[Tuple[Optional[str], str]], int]:
+    entries = []
+    page_lines: Dict[int, List[int]] = {}
+    for chunk in chunks:
+        for line in chunk["text"].split("\n"):
+            if chunk.get("page") is not None and line.strip():
+                page_lines.setdefault(chunk["page"], []).append(len(entries))
+            entries.append((chunk.get("section"), line))
+
+    # Only lines at the top or bottom of a page can be running headers/footers
+    edge_positions = set()
+    pages_by_edge_line: Dict[str, set] = {}
+    for page, positions in page_lines.items():
+        edges = positions[:BOILERPLATE_EDGE_LINES] + positions[-BOILERPLATE_EDGE_LINES:]
+        for position in edges:
+            line = entries[position][1]
+            if len(line) <= 100:
+                edge_positions.add(position)
+                pages_by_edge_line.setdefault(line.strip().lower(), set()).add(page)
+
+    seen_boilerplate = set()
+    lines = []
+    dropped = 0
+    previous = None
+    for position, (section, line) in enumerate(entries):
+        key = line.strip().lower()
+        if _PAGE_NUMBER_RE.match(line.strip()) or key == previous:
+            dropped += 1
+            continue
+        previous = key
+
+        if position in edge_positions and len(pages_by_edge_line.get(key, ())) > 1:
+            if key in seen_boilerplate:
+                dropped += 1
+                continue
+            seen_boilerplate.add(key)
+
+        lines.append((section, line))
+    return lines, dropped
+
+
+def compress_resume_chunks(chunks: List[Dict], token_budget: int = RESUME_TOKEN_BUDGET) -> Tuple[str, Dict]:
+    original_tokens = count_tokens("\n".join(chunk["text"] for chunk in chunks))
+    lines, boilerplate_dropped = strip_page_boilerplate(chunks)
+
+    ranked = sorted(range(len(lines)), key=lambda i: (section_priority(lines[i][0]), i))
+    kept = []
+    used = 0
+    for i in ranked:
+        cost = count_tokens(lines[i][1]) + 1
+        if used + cost > token_budget:
+            # Keep looking: a later, shorter line may still fit
+            continue
+        kept.append(i)
+        used += cost
+
+    if not any(lines[i][1].strip() for i in kept):
+        # Every line with content is over budget on its own; keep the top-ranked one cut to the budget
+        first = next((i for i in ranked if lines[i][1].strip()), None)
+        if first is not None:
+            lines[first] = (lines[first][0], truncate_to_tokens(lines[first][1], token_budget))
+            kept = [first]
+
+    text = "\n".join(lines[i][1] for i in sorted(kept))
+    compressed_tokens = count_tokens(text)
+    return text, {
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "tokens_saved": original_tokens - compressed_tokens,
+        "lines_dropped": boilerplate_dropped + len(lines) - len(kept)
+    }
@@ -0,0 +1,121 @@
+from typing import Optional, Union
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
+import sqlite3
+import time
+import uuid
+import os
+
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL = float(os.getenv("SESSION_TTL", "7200"))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "5000"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+
+
+class SessionStore(ABC):
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def put(self, session_id: str, state: bytes):
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+
+    def __init__(self, ttl: float = SESSION_TTL, max_entries: int = SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+
+            state, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[session_id]
+                return None
+
+            self._entries.move_to_end(session_id)
+            return state
+
+    def put(self, session_id: str, state: bytes):
+        with self._lock:
+            self._entries[session_id] = (state, time.monotonic() + self.ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+
+    def __init__(self, db_path: str = SESSION_DB_PATH, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+        self._conn.commit()
+
+    def get(self, session_id: str) -> Optional[Union[bytes, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, expires_at FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._conn.commit()
+                return None
+
+        return row[0]
+
+    def put(self, session_id: str, state: bytes):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, sqlite3.Binary(state), now + self.ttl)
+            )
+            self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+            self._conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+def create_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown session store: {backend}")
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional
+import re
+
+
+SKILL_ALIASES = {
+    "Python": ["python", "python3", "python 3", "py", "cpython"],
+    "Java": ["java", "core java", "java se", "java ee", "j2ee"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6", "vanilla js"],
+    "TypeScript": ["typescript", "ts"],
+    "C": ["c", "c language", "ansi c"],
+    "C++": ["c++", "cpp", "c plus plus"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Go": ["go", "golang", "go lang"],
+    "Rust": ["rust", "rustlang"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r", "r language"],
+    "SQL": ["sql", "structured query language"],
+    "Bash": ["bash", "shell", "shell scripting", "bash scripting"],
+    "Django": ["django", "django rest framework", "drf"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Spring": ["spring", "spring framework"],
+    "Spring Boot": ["spring boot", "springboot"],
+    "Ruby on Rails": ["ruby on rails", "rails", "ror"],
+    "Laravel": ["laravel"],
+    ".NET": [".net", "dotnet", "dot net", ".net core", "asp.net", "asp.net core"],
+    "React": ["react", "reactjs", "react.js", "react js"],
+    "React Native": ["react native", "react-native"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "vue.js", "vue js"],
+    "Next.js": ["next.js", "nextjs", "next js"],
+    "Node.js": ["node", "nodejs", "node.js", "node js"],
+    "Express": ["express", "expressjs", "express.js"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"],
+    "PostgreSQL": ["postgresql", "postgres", "psql", "pgsql"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "SQLite": ["sqlite", "sqlite3"],
+    "Oracle": ["oracle", "oracle db", "oracle database"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "elastic"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Git": ["git"],
+    "Linux": ["linux", "unix"],
+    "Kafka": ["kafka", "apache kafka"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest", "rest api", "rest apis", "restful", "restful apis"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "TensorFlow": ["tensorflow", "tf"],
+    "PyTorch": ["pytorch", "torch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Apache Spark": ["spark", "apache spark", "pyspark"],
+    "Machine Learning": ["machine learning", "ml"],
+    "CI/CD": ["ci/cd", "cicd", "ci cd"],
+    "Jenkins": ["jenkins"],
+    "Microservices": ["microservices", "micro services", "microservice architecture"]
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_VERSION_SUFFIX_RE = re.compile(r"\s*v?\d+(\.\d+)*(\.x)?$")
+
+
+def _alias_key(skill: str) -> str:
+    return _WHITESPACE_RE.sub(" ", skill.strip().lower())
+
+
+ALIAS_INDEX: Dict[str, str] = {}
+for _canonical, _aliases in SKILL_ALIASES.items():
+    ALIAS_INDEX[_alias_key(_canonical)] = _canonical
+    for _alias in _aliases:
+        ALIAS_INDEX[_alias_key(_alias)] = _canonical
+
+
+def lookup_skill(skill: str) -> Optional[str]:
+    key = _alias_key(skill)
+    canonical = ALIAS_INDEX.get(key)
+    if canonical is None:
+        canonical = ALIAS_INDEX.get(_VERSION_SUFFIX_RE.sub("", key))
+    return canonical
+
+
+def normalize_skill(skill: str) -> str:
+    return lookup_skill(skill) or _WHITESPACE_RE.sub(" ", skill.strip())
+
+
+def merge_skills(existing: Optional[Iterable], new_items: Optional[Iterable]) -> List[str]:
+    merged = []
+    seen = set()
+    for skill in list(existing or []) + list(new_items or []):
+        if not isinstance(skill, str) or not skill.strip():
+            continue
+        normalized = normalize_skill(skill)
+        key = normalized.lower()
+        if key not in seen:
+            seen.add(key)
+            merged.append(normalized)
+    return merged
+
+
+def normalize_skills(skills) -> List[str]:
+    if isinstance(skills, str):
+        skills = [skills]
+    return merge_skills([], skills)
@@ -0,0 +1,105 @@
+from typing import Dict, List, Union
+import json
+import os
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+    _COMPRESSOR = zstandard.ZstdCompressor(level=3)
+    _DECOMPRESSOR = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+
+STATE_CODEC = os.getenv("STATE_CODEC", "msgpack" if msgpack is not None else "json")
+STATE_COMPRESS_MIN_BYTES = int(os.getenv("STATE_COMPRESS_MIN_BYTES", "4096"))
+STATE_MAX_BYTES = int(os.getenv("STATE_MAX_BYTES", str(2 * 1024 * 1024)))
+
+STATE_FORMAT_VERSION = 1
+_MAGIC = b"TS"
+_HEADER_SIZE = 4
+_FLAG_MSGPACK = 0x01
+_FLAG_ZSTD = 0x02
+
+
+def _dumps_json(record) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, separators=(",", ":")).encode("utf-8")
+
+
+def _loads_json(payload) -> Union[List, Dict]:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(bytes(payload))
+
+
+def _decompress(body, max_size: int) -> bytes:
+    # Check the declared frame size first; decompress() would allocate it up front
+    try:
+        content_size = zstandard.get_frame_parameters(body).content_size
+        if content_size != zstandard.CONTENTSIZE_UNKNOWN and content_size > max_size:
+            raise ValueError(f"Decompressed state would exceed {max_size} bytes")
+        return _DECOMPRESSOR.decompress(body, max_output_size=max_size)
+    except zstandard.ZstdError as e:
+        raise ValueError(f"Invalid compressed state: {e}")
+
+
+def encode_state(record: List, codec: str = STATE_CODEC, compress: bool = True) -> bytes:
+    flags = 0
+    if codec == "msgpack":
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        body = msgpack.packb(record, use_bin_type=True)
+        flags |= _FLAG_MSGPACK
+    elif codec == "json":
+        body = _dumps_json(record)
+    else:
+        raise ValueError(f"Unknown state codec: {codec}")
+
+    if compress and zstandard is not None and len(body) >= STATE_COMPRESS_MIN_BYTES:
+        body = _COMPRESSOR.compress(body)
+        flags |= _FLAG_ZSTD
+
+    return _MAGIC + bytes((STATE_FORMAT_VERSION, flags)) + body
+
+
+def decode_state(payload: Union[bytes, bytearray, memoryview, str], allow_compressed: bool = True,
+                 max_size: int = STATE_MAX_BYTES) -> Union[List, Dict]:
+    if len(payload) > max_size:
+        raise ValueError(f"State exceeds {max_size} bytes")
+    if isinstance(payload, str):
+        return json.loads(payload)
+
+    view = memoryview(payload)
+    if view[:2] != _MAGIC:
+        return _loads_json(view)
+    if len(view) < _HEADER_SIZE:
+        raise ValueError("Truncated state header")
+
+    version, flags = view[2], view[3]
+    if version > STATE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported state format version: {version}")
+
+    body = view[_HEADER_SIZE:]
+    if flags & _FLAG_ZSTD:
+        if not allow_compressed:
+            raise ValueError("Compressed state is not accepted here")
+        if zstandard is None:
+            raise ValueError("State is zstd-compressed but zstandard is not installed")
+        body = _decompress(body, max_size)
+
+    if flags & _FLAG_MSGPACK:
+        if msgpack is None:
+            raise ValueError("State is msgpack-encoded but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return _loads_json(body)
@@ -1,3 +1,6 @@
+PROMPT_VERSION = "4"
+
+
 RESUME_PARSING_PROMPT = """
 You are an expert HR assistant. Extract information from the following resume text and return ONLY a valid JSON object.
 
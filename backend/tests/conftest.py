@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("PARSE_CACHE_ENABLED", "false")
+os.environ.setdefault("QUESTION_BANK_PATH", "")
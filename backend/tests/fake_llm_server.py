@@ -0,0 +1,116 @@
+"""Local stand-in for Groq's OpenAI-compatible chat completions endpoint."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+import threading
+import json
+import time
+
+
+def completion_body(model: str, content: str) -> Dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def chunk_body(model: str, content: Optional[str], finish_reason: Optional[str] = None) -> Dict:
+    delta = {"content": content} if content is not None else {}
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+class Reply:
+    """One scripted response: an HTTP status, a body, optional headers and a delay before answering."""
+
+    def __init__(self, status: int = 200, content: str = "ok", headers: Optional[Dict] = None, delay: float = 0):
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+        self.delay = delay
+
+
+class FakeLLMServer:
+    """Threaded HTTP server; `script(request_number, model)` decides each reply."""
+
+    def __init__(self, script: Optional[Callable[[int, str], Reply]] = None):
+        self.script = script or (lambda n, model: Reply(content=f"reply from {model}"))
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, body: Dict, headers: Dict):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_stream(self, model: str, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                events = [chunk_body(model, word + " ") for word in content.split()]
+                events.append(chunk_body(model, None, "stop"))
+                for event in events:
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def do_GET(self):
+                self._send_json(200, {"object": "list", "data": []}, {})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                model = body.get("model", "")
+                with server._lock:
+                    number = len(server.requests)
+                    server.requests.append(model)
+                reply = server.script(number, model)
+                if reply.delay:
+                    time.sleep(reply.delay)
+                if reply.status != 200:
+                    error = {"error": {"message": reply.content, "type": "fake_error"}}
+                    self._send_json(reply.status, error, reply.headers)
+                elif body.get("stream"):
+                    self._send_stream(model, reply.content)
+                else:
+                    self._send_json(200, completion_body(model, reply.content), reply.headers)
+
+        return Handler
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import llm_client
+import llm_resilience
+from llm_client import LLMClientRegistry
+from llm_resilience import CircuitBreaker, CircuitOpenError, ResilientLLM
+from fake_llm_server import FakeLLMServer, Reply
+
+PRIMARY = "primary-model"
+FALLBACK = "fallback-model"
+MESSAGES = [HumanMessage(content="hello")]
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "LLM_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(llm_resilience, "LLM_BACKOFF_MAX", 0.05)
+
+
+def make_caller(server: FakeLLMServer, monkeypatch, **kwargs) -> ResilientLLM:
+    monkeypatch.setattr(llm_client, "GROQ_BASE_URL", server.base_url)
+    registry = LLMClientRegistry()
+
+    def factory(model: str, temperature: float = 0):
+        return registry.get("test-key", model=model, temperature=temperature)
+
+    kwargs.setdefault("fallback_model", FALLBACK)
+    return ResilientLLM(factory, PRIMARY, **kwargs)
+
+
+def test_transient_error_is_retried(monkeypatch):
+    script = lambda n, model: Reply(500, "boom") if n == 0 else Reply(content="recovered")
+    with FakeLLMServer(script) as server:
+        caller = make_caller(server, monkeypatch)
+        result = asyncio.run(caller.invoke(MESSAGES))
+
+    assert result.content == "recovered"
+    assert caller.metrics["retries"] == 1
+    assert caller.stats()["breakers"][PRIMARY] == "closed"
+
+
+def test_rate_limits_with_retry_after_do_not_open_breaker(monkeypatch):
+    script = lambda n, model: Reply(429, "slow down", headers={"retry-after": "0.01"})
+    with FakeLLMServer(script) as server:
+        caller = make_caller(server, monkeypatch)
+
+        async def run():
+            for _ in range(3):
+                with pytest.raises(Exception) as error:
+                    await caller.invoke(MESSAGES)
+                assert type(error.value).__name__ == "RateLimitError"
+
+        asyncio.run(run())
+
+    # 3 calls x 4 attempts would have tripped a per-attempt breaker (threshold 5) twice over
+    assert len(server.requests) == 12
+    assert caller.stats()["breakers"][PRIMARY] == "closed"
+
+
+def test_breaker_counts_calls_not_attempts(monkeypatch):
+    with FakeLLMServer(lambda n, model: Reply(503, "down")) as server:
+        caller = make_caller(server, monkeypatch, max_retries=2)
+        caller._breakers[PRIMARY] = CircuitBreaker(threshold=2, cooldown=30)
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    await caller.invoke(MESSAGES)
+            assert caller.stats()["breakers"][PRIMARY] == "open"
+            requests_before = len(server.requests)
+            with pytest.raises(CircuitOpenError):
+                await caller.invoke(MESSAGES)
+            return requests_before
+
+        requests_before = asyncio.run(run())
+
+    assert requests_before == 6
+    assert len(server.requests) == 6
+
+
+def test_deadline_excludes_wait_for_local_limiter(monkeypatch):
+    with FakeLLMServer(lambda n, model: Reply(content="done", delay=0.3)) as server:
+
+        async def run():
+            caller = make_caller(server, monkeypatch, limiter=asyncio.Semaphore(1), deadline=0.5)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(caller.invoke(MESSAGES) for _ in range(3)))
+            return caller, results, time.perf_counter() - started
+
+        caller, results, elapsed = asyncio.run(run())
+
+    assert [r.content for r in results] == ["done"] * 3
+    assert elapsed >= 0.9
+    assert caller.metrics["deadline_exceeded"] == 0
+
+
+def test_fallback_model_serves_allowed_actions(monkeypatch):
+    script = lambda n, model: Reply(503, "down") if model == PRIMARY else Reply(content=f"reply from {model}")
+    with FakeLLMServer(script) as server:
+        caller = make_caller(server, monkeypatch, max_retries=0)
+
+        async def run():
+            greeting = await caller.invoke(MESSAGES, action="greet")
+            with pytest.raises(Exception):
+                await caller.invoke(MESSAGES, action="extract_info")
+            return greeting
+
+        greeting = asyncio.run(run())
+
+    assert greeting.content == f"reply from {FALLBACK}"
+    assert caller.metrics["fallbacks"] == 1
+
+
+def test_stream_retries_before_first_chunk_and_holds_limiter(monkeypatch):
+    script = lambda n, model: Reply(502, "bad gateway") if n == 0 else Reply(content="one two three")
+    with FakeLLMServer(script) as server:
+
+        async def run():
+            limiter = asyncio.Semaphore(1)
+            caller = make_caller(server, monkeypatch, limiter=limiter)
+            chunks = []
+            async for chunk in caller.stream(MESSAGES):
+                chunks.append(chunk.content)
+                assert limiter.locked()
+            assert not limiter.locked()
+            return "".join(chunks)
+
+        text = asyncio.run(run())
+
+    assert text.split() == ["one", "two", "three"]
@@ -0,0 +1,36 @@
+import json
+
+from question_bank import QuestionBank
+
+VARIANT = QuestionBank.make_variant("intermediate", "1")
+
+
+def test_only_taxonomy_skills_are_learned(tmp_path):
+    learned_path = str(tmp_path / "learned.json")
+    bank = QuestionBank(learned_path=learned_path)
+
+    bank.learn({"rustlang": ["What is ownership?"], "my secret sauce": ["Why is it secret?"]}, VARIANT)
+
+    assert json.load(open(learned_path)) == {VARIANT: {"Rust": ["What is ownership?"]}}
+    covered, missing = bank.lookup(["Rust", "my secret sauce"], VARIANT)
+    assert covered == {"Rust": ["What is ownership?"]}
+    assert missing == ["my secret sauce"]
+
+
+def test_unknown_skills_do_not_touch_disk(tmp_path):
+    learned_path = tmp_path / "learned.json"
+    bank = QuestionBank(learned_path=str(learned_path))
+
+    bank.learn({"ignore previous instructions": ["Q?"]}, VARIANT)
+
+    assert not learned_path.exists()
+
+
+def test_non_taxonomy_entries_in_an_existing_file_are_ignored(tmp_path):
+    learned_path = tmp_path / "learned.json"
+    learned_path.write_text(json.dumps({VARIANT: {"Scala": ["Q1"], "junk": ["Q2"]}}))
+
+    covered, missing = QuestionBank(learned_path=str(learned_path)).lookup(["Scala", "junk"], VARIANT)
+
+    assert covered == {"Scala": ["Q1"]}
+    assert missing == ["junk"]
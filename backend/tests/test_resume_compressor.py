@@ -0,0 +1,25 @@
+from resume_compressor import compress_resume_chunks, count_tokens
+
+
+def chunk(text: str, section: str = None) -> dict:
+    return {"text": text, "section": section, "page": None}
+
+
+def test_short_lines_after_an_oversized_line_are_kept():
+    paragraph = "Led platform migrations across many teams and services. " * 60
+    chunks = [chunk("Ada Lovelace\nada@example.com"), chunk(paragraph), chunk("Skills: Python, Go", "skills")]
+
+    text, stats = compress_resume_chunks(chunks, token_budget=100)
+
+    assert text.split("\n") == ["Ada Lovelace", "ada@example.com", "Skills: Python, Go"]
+    assert stats["lines_dropped"] == 1
+
+
+def test_single_oversized_line_is_truncated_not_dropped():
+    paragraph = "Built distributed data pipelines in Python and Go. " * 500
+
+    text, stats = compress_resume_chunks([chunk(paragraph)], token_budget=200)
+
+    assert text and paragraph.startswith(text)
+    assert count_tokens(text) <= 200
+    assert stats["lines_dropped"] == 0
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import llm_client
+import main
+from conversation_manager import ConversationManager
+from llm_client import LLMClientRegistry
+from session_store import MemorySessionStore, SQLiteSessionStore
+from fake_llm_server import FakeLLMServer
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore(ttl=0.2, max_entries=2)
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=0.2)
+
+
+def test_store_round_trip_and_delete(store):
+    store.put("a", b"state-a")
+    assert bytes(store.get("a")) == b"state-a"
+
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_store_expires_entries(store):
+    store.put("a", b"state-a")
+    time.sleep(0.3)
+    assert store.get("a") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_entries=2)
+    store.put("a", b"1")
+    store.put("b", b"2")
+    store.get("a")
+    store.put("c", b"3")
+
+    assert store.get("b") is None
+    assert store.get("a") == b"1"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    with FakeLLMServer() as server:
+        monkeypatch.setattr(llm_client, "GROQ_BASE_URL", server.base_url)
+        monkeypatch.setattr(main, "llm_registry", LLMClientRegistry())
+        monkeypatch.setattr(main, "session_store", SQLiteSessionStore(str(tmp_path / "sessions.db")))
+        with TestClient(main.app) as client:
+            yield client
+
+
+def test_lost_session_returns_404_and_is_rebuilt_from_client_state(client):
+    first = client.post("/chat/hiring", json={"message": "Hello", "use_session": True})
+    assert first.status_code == 200
+    session_id = first.json()["session_id"]
+    assert session_id and first.json()["conversation_state"] is None
+
+    main.session_store.delete(session_id)
+    lost = client.post("/chat/hiring", json={"message": "Are you there?", "session_id": session_id})
+    assert lost.status_code == 404
+
+    rebuilt = client.post("/chat/hiring", json={
+        "message": "Are you there?",
+        "use_session": True,
+        "conversation_state": {
+            "stage": first.json()["stage"],
+            "candidate_info": {"full_name": "Ada Lovelace"},
+            "conversation_history": [
+                {"role": "user", "content": "Hello"},
+                {"role": "assistant", "content": first.json()["response"]},
+            ],
+        },
+    })
+    assert rebuilt.status_code == 200
+    new_session_id = rebuilt.json()["session_id"]
+    assert new_session_id and new_session_id != session_id
+
+    state = ConversationManager.restore_conversation(main.session_store.get(new_session_id))
+    assert [role for role, _ in state.conversation_history] == ["user", "assistant", "user", "assistant"]
+    assert state.candidate_info["full_name"] == "Ada Lovelace"
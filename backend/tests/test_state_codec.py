@@ -0,0 +1,25 @@
+import pytest
+
+from conversation_manager import ConversationManager, ConversationState
+from state_codec import encode_state
+
+
+def test_compact_state_round_trips():
+    state = ConversationState()
+    state.add_message("user", "Hello")
+    payload = ConversationManager.serialize_conversation(state)
+
+    restored = ConversationManager.restore_conversation(payload, trusted=False)
+
+    assert [tuple(message) for message in restored.conversation_history] == [("user", "Hello")]
+
+
+@pytest.mark.parametrize("payload", [b"TS", b"TS\x01", b"5", b'"text"', b"[1, 2]", b"null"])
+def test_malformed_client_state_raises_value_error(payload):
+    with pytest.raises(ValueError):
+        ConversationManager.restore_conversation(payload, trusted=False)
+
+
+def test_record_with_wrong_arity_raises_value_error():
+    with pytest.raises(ValueError):
+        ConversationManager.restore_conversation(encode_state(["greeting", {}]), trusted=False)
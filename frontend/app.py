@@ -1,14 +1,16 @@
 import streamlit as st
 import os
-import time
 import requests
-import base64
 import json
-import threading
-from auth import sign_up, login, is_firebase_initialized
-from chat_history import save_chat, load_chat, get_all_chats, delete_chat, new_chat_id
+from auth import sign_up, login, ensure_session
+from firestore_executor import firestore_executor, FIRESTORE_TIMEOUT
+from chat_history import load_chat, list_chats, delete_chat, new_chat_id, chat_writer, chat_store_available
 
 BACKEND_URL = os.getenv("BACKEND_URL", "https://talent-scouting.vercel.app/")
+# Server-side sessions need a backend whose session store is shared by every instance
+CHAT_SESSION_MODE = os.getenv("CHAT_SESSION_MODE", "false").lower() == "true"
+# "compact" round-trips base64 msgpack, which is no smaller than plain JSON state
+CHAT_STATE_FORMAT = os.getenv("CHAT_STATE_FORMAT", "json")
 
 # ============================================================
 # Page Configuration
@@ -29,68 +31,117 @@ defaults = {
     "authenticated": False,
     "user_email": "",
     "user_id": "",
+    "auth_session": None,
+    "login_notice": "",
     "is_guest": False,
     "messages": [],
     "current_chat_id": "",
+    "session_id": None,
+    "encoded_state": None,
     "conversation_state": None,
+    "stage": None,
     "candidate_info": None,
     "tech_questions": None,
     "conversation_ended": False,
     "greeting_shown": False,
     "temperature": 0.7,
     "parsed_document_context": None,
+    "document_context_pending": False,
     "clear_uploader": False,
+    "chat_list_pages": 1,
 }
 for k, v in defaults.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
 # ============================================================
-# Firestore helpers — all wrapped with hard timeouts
-# so they NEVER block the UI thread
+# Firestore helpers — run on a shared bounded executor with
+# hard timeouts so they NEVER block the UI thread
 # ============================================================
-def _run_with_timeout(fn, timeout=15):
-    """Run fn() in a thread. Return (result, error). Never hangs."""
-    if not is_firebase_initialized():
-        return None, Exception("Firebase not initialized")
-
-    result_holder = [None]
-    error_holder = [None]
-    def worker():
-        try:
-            result_holder[0] = fn()
-        except Exception as e:
-            error_holder[0] = e
-    t = threading.Thread(target=worker, daemon=True)
-    t.start()
-    t.join(timeout=timeout)
-    if t.is_alive():
-        return None, TimeoutError(f"Firestore call timed out after {timeout}s")
-    return result_holder[0], error_holder[0]
-
-def safe_get_all_chats(user_id):
-    result, err = _run_with_timeout(lambda: get_all_chats(user_id), timeout=15)
+def _run_with_timeout(fn, timeout=FIRESTORE_TIMEOUT):
+    """Run fn() on the shared Firestore executor. Return (result, error). Never hangs."""
+    if not chat_store_available():
+        return None, Exception("Chat store not available")
+
+    return firestore_executor.run(fn, timeout=timeout)
+
+def safe_list_chats(user_id, after=None):
+    result, err = _run_with_timeout(lambda: list_chats(user_id, after=after))
     if err:
-        print(f"safe_get_all_chats error: {err}")
-        return []
-    return result or []
+        print(f"safe_list_chats error: {err}")
+        return [], None
+    return result or ([], None)
+
+def safe_get_chat_pages(user_id, pages):
+    chats, cursor = safe_list_chats(user_id)
+    for _ in range(pages - 1):
+        if not cursor:
+            break
+        more, cursor = safe_list_chats(user_id, after=cursor)
+        chats = chats + more
+    return chats, cursor
 
 def safe_load_chat(user_id, chat_id):
-    result, err = _run_with_timeout(lambda: load_chat(user_id, chat_id), timeout=15)
+    result, err = _run_with_timeout(lambda: load_chat(user_id, chat_id))
     if err:
         print(f"safe_load_chat error: {err}")
         return None # Return None to indicate error rather than empty list
     return result
 
 def safe_save_chat(user_id, chat_id, messages):
-    if not is_firebase_initialized():
+    if not chat_store_available():
         return
-    # Fire and forget in background — never block UI
-    t = threading.Thread(
-        target=lambda: save_chat(user_id, chat_id, messages),
-        daemon=True
-    )
-    t.start()
+    # Queued for the write-behind worker — never blocks the UI
+    chat_writer.enqueue(user_id, chat_id, messages)
+
+def iter_sse_events(resp):
+    """Yield (event, data) pairs from a text/event-stream response."""
+    resp.encoding = "utf-8"
+    event, data_lines = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].strip())
+
+def rebuild_conversation_state(history):
+    """Conversation state rebuilt from what the UI kept, used when the server lost the session."""
+    return {
+        "stage": st.session_state.stage,
+        "candidate_info": st.session_state.candidate_info or {},
+        "tech_questions": st.session_state.tech_questions or {},
+        "conversation_history": [
+            {"role": m["role"], "content": m["content"]}
+            for m in history if not m["content"].startswith("❌")
+        ],
+        "document_context": st.session_state.parsed_document_context,
+    }
+
+def chat_turn_payload(prompt, rebuild=False):
+    """Request body for one chat turn in session or stateless mode."""
+    # Document context is sent once; the backend keeps it on the conversation state
+    document_context = None
+    if st.session_state.document_context_pending:
+        document_context = st.session_state.parsed_document_context
+    payload = {"message": prompt, "document_context": document_context}
+
+    if not CHAT_SESSION_MODE and CHAT_STATE_FORMAT == "compact":
+        payload["encoded_state"] = st.session_state.encoded_state
+        payload["state_format"] = "compact"
+    elif not CHAT_SESSION_MODE:
+        payload["conversation_state"] = st.session_state.conversation_state
+    elif rebuild:
+        payload["use_session"] = True
+        payload["conversation_state"] = rebuild_conversation_state(st.session_state.messages[:-1])
+        payload["document_context"] = None
+    else:
+        payload["use_session"] = True
+        payload["session_id"] = st.session_state.session_id
+    return payload
 
 def format_resume_output(parsed_data):
     output = "**Resume Analysis Complete**\n\n"
@@ -184,6 +235,9 @@ if not st.session_state.authenticated:
     st.markdown("<p style='text-align:center;color:#888;'>Sign in to access the hiring assistant</p>", unsafe_allow_html=True)
     st.markdown("")
 
+    if st.session_state.login_notice:
+        st.info(st.session_state.login_notice)
+
     tab_login, tab_signup = st.tabs(["  Login  ", "  Sign Up  "])
 
     with tab_login:
@@ -204,6 +258,7 @@ if not st.session_state.authenticated:
                     st.session_state.authenticated = True
                     st.session_state.user_email = result["user"]["email"]
                     st.session_state.user_id = result["user"]["localId"]
+                    st.session_state.auth_session = result["user"]
                     st.session_state.is_guest = False
                     st.session_state.current_chat_id = new_chat_id()
                     st.session_state.messages = []
@@ -233,6 +288,7 @@ if not st.session_state.authenticated:
                     st.session_state.authenticated = True
                     st.session_state.user_email = result["user"]["email"]
                     st.session_state.user_id = result["user"]["localId"]
+                    st.session_state.auth_session = result["user"]
                     st.session_state.is_guest = False
                     st.session_state.current_chat_id = new_chat_id()
                     st.session_state.messages = []
@@ -255,6 +311,17 @@ else:
     # Firestore history loads here lazily — never blocks login
     # --------------------------------------------------------
 
+    # Verified sessions are cached in-process, so this is a dict lookup
+    # on most reruns and a token refresh shortly before expiry
+    if not st.session_state.is_guest and st.session_state.auth_session:
+        auth_session = ensure_session(st.session_state.auth_session)
+        if auth_session is None:
+            for k, v in defaults.items():
+                st.session_state[k] = v
+            st.session_state.login_notice = "Your session has expired. Please log in again."
+            st.rerun()
+        st.session_state.auth_session = auth_session
+
     with st.sidebar:
         if st.session_state.is_guest:
             st.markdown("**👤 Guest Mode**")
@@ -269,12 +336,16 @@ else:
                 safe_save_chat(st.session_state.user_id, st.session_state.current_chat_id, st.session_state.messages)
             st.session_state.current_chat_id = new_chat_id()
             st.session_state.messages = []
+            st.session_state.session_id = None
+            st.session_state.encoded_state = None
             st.session_state.conversation_state = None
+            st.session_state.stage = None
             st.session_state.candidate_info = None
             st.session_state.tech_questions = None
             st.session_state.conversation_ended = False
             st.session_state.greeting_shown = False
             st.session_state.parsed_document_context = None
+            st.session_state.document_context_pending = False
             st.session_state.clear_uploader = False
 
         st.button("➕ New Chat", use_container_width=True, on_click=start_new_chat)
@@ -282,7 +353,7 @@ else:
         if not st.session_state.is_guest:
             st.markdown("### 💬 Chat History")
             # Load history with timeout — never hangs
-            all_chats = safe_get_all_chats(st.session_state.user_id)
+            all_chats, more_chats_cursor = safe_get_chat_pages(st.session_state.user_id, st.session_state.chat_list_pages)
             if all_chats:
                 for chat in all_chats:
                     col1, col2 = st.columns([4, 1])
@@ -307,6 +378,9 @@ else:
                                 st.session_state.current_chat_id = new_chat_id()
                                 st.session_state.messages = []
                             st.rerun()
+                if more_chats_cursor and st.button("Load more", use_container_width=True):
+                    st.session_state.chat_list_pages += 1
+                    st.rerun()
             else:
                 st.caption("No previous chats")
 
@@ -328,6 +402,8 @@ else:
         if st.button(logout_label, use_container_width=True):
             if not st.session_state.is_guest and st.session_state.messages:
                 safe_save_chat(st.session_state.user_id, st.session_state.current_chat_id, st.session_state.messages)
+            if not st.session_state.is_guest and not chat_writer.flush():
+                print("Logout: some chats were still being saved when the flush timed out")
             for k, v in defaults.items():
                 st.session_state[k] = v
             st.rerun()
@@ -365,17 +441,16 @@ This conversation will take approximately 5-10 minutes. Let's begin - could you
         uploaded_file = st.file_uploader("Upload", type=["pdf","docx","txt"], key="file_uploader", label_visibility="collapsed")
     with upload_col3:
         if uploaded_file and st.button("📄 Parse", use_container_width=True):
-            file_bytes = uploaded_file.read()
-            file_b64 = base64.b64encode(file_bytes).decode("utf-8")
-            endpoint = "/parse/resume" if parse_type == "Resume" else "/parse/jd"
-            payload = {"fileName": uploaded_file.name, "fileContent": file_b64}
+            endpoint = "/parse/resume/upload" if parse_type == "Resume" else "/parse/jd/upload"
+            upload = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type or "application/octet-stream")}
             st.session_state.messages.append({"role": "user", "content": f"Uploaded {uploaded_file.name} for {parse_type} parsing"})
             with st.spinner(f"Parsing {parse_type.lower()}..."):
                 try:
-                    resp = requests.post(f"{BACKEND_URL}{endpoint}", json=payload, timeout=60)
+                    resp = requests.post(f"{BACKEND_URL}{endpoint}", files=upload, timeout=60)
                     if resp.status_code == 200:
                         parsed = resp.json()
                         st.session_state.parsed_document_context = {"type": parse_type, "filename": uploaded_file.name, "data": parsed}
+                        st.session_state.document_context_pending = True
                         formatted = format_resume_output(parsed) if parse_type == "Resume" else format_jd_output(parsed)
                         formatted += f"\n\n**Document loaded into context.** You can now ask me questions about this {parse_type.lower()}."
                         st.session_state.messages.append({"role": "assistant", "content": formatted})
@@ -396,32 +471,48 @@ This conversation will take approximately 5-10 minutes. Let's begin - could you
             full_response = ""
             with st.spinner("Thinking..."):
                 try:
-                    message_with_context = prompt
-                    if st.session_state.parsed_document_context:
-                        doc_ctx = st.session_state.parsed_document_context
-                        message_with_context = (
-                            f"[DOCUMENT CONTEXT - {doc_ctx['type']}: {doc_ctx['filename']}]\n"
-                            f"Document Data: {json.dumps(doc_ctx['data'])}\n\n"
-                            f"User Question: {prompt}"
-                        )
                     resp = requests.post(
-                        f"{BACKEND_URL}/chat/hiring",
-                        json={"message": message_with_context, "conversation_state": st.session_state.conversation_state},
+                        f"{BACKEND_URL}/chat/hiring/stream",
+                        json=chat_turn_payload(prompt),
+                        stream=True,
                         timeout=60
                     )
+                    if resp.status_code == 404 and CHAT_SESSION_MODE and st.session_state.stage:
+                        # The session lived on another instance or expired: rebuild it from what we kept
+                        print("Chat session not found on the backend, rebuilding it from local state")
+                        resp = requests.post(
+                            f"{BACKEND_URL}/chat/hiring/stream",
+                            json=chat_turn_payload(prompt, rebuild=True),
+                            stream=True,
+                            timeout=60
+                        )
                     if resp.status_code == 200:
-                        data = resp.json()
-                        assistant_response = data["response"]
-                        st.session_state.conversation_state = data["conversation_state"]
-                        if data.get("candidate_info"): st.session_state.candidate_info = data["candidate_info"]
-                        if data.get("tech_questions"): st.session_state.tech_questions = data["tech_questions"]
-                        for chunk in assistant_response.split():
-                            full_response += chunk + " "
-                            time.sleep(0.02)
-                            message_placeholder.markdown(full_response + "▌")
+                        data = None
+                        for event, payload in iter_sse_events(resp):
+                            if event == "token":
+                                full_response += payload["token"]
+                                message_placeholder.markdown(full_response + "▌")
+                            elif event == "done":
+                                data = payload
+                            elif event == "error":
+                                raise Exception(payload.get("detail", "Unknown error"))
+                        if data:
+                            full_response = data["response"]
+                            st.session_state.session_id = data.get("session_id")
+                            st.session_state.encoded_state = data.get("encoded_state")
+                            st.session_state.conversation_state = data.get("conversation_state")
+                            st.session_state.stage = data.get("stage")
+                            st.session_state.document_context_pending = False
+                            if data.get("candidate_info"): st.session_state.candidate_info = data["candidate_info"]
+                            if data.get("tech_questions"): st.session_state.tech_questions = data["tech_questions"]
+                            if data.get("conversation_ended"):
+                                st.session_state.conversation_ended = True
+                        message_placeholder.markdown(full_response)
+                    elif resp.status_code == 404:
+                        st.session_state.session_id = None
+                        st.session_state.document_context_pending = st.session_state.parsed_document_context is not None
+                        full_response = "❌ Your interview session expired. Please send your message again to start a new one."
                         message_placeholder.markdown(full_response)
-                        if data.get("conversation_ended"):
-                            st.session_state.conversation_ended = True
                     else:
                         full_response = f"❌ Error: {resp.json().get('detail','Unknown error')}"
                         message_placeholder.markdown(full_response)
@@ -0,0 +1,81 @@
+"""Per-operation latency and throughput of the memory, SQLite and Firestore chat stores.
+
+Run from frontend/: python benchmarks/bench_chat_store.py [--chats 50] [--turns 20] [--firestore]
+Firestore is only measured with --firestore and an initialised firebase_admin app.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_history import CHAT_LIST_PAGE_SIZE, FirestoreChatStore, MemoryChatStore, SQLiteChatStore
+
+
+def turn_messages(turn: int) -> list:
+    return [
+        {"role": "user", "content": f"Turn {turn}: I have built REST APIs with Django and PostgreSQL for five years."},
+        {"role": "assistant", "content": f"Question {turn}: how would you paginate a large queryset efficiently?"},
+    ]
+
+
+def run_store(store, chats: int, turns: int) -> dict:
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    chat_ids = [f"chat-{i:04d}" for i in range(chats)]
+    samples = {"append": [], "persisted_count": [], "load_messages": [], "list_chats": [], "delete_chat": []}
+
+    def timed(op, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        samples[op].append(time.perf_counter() - started)
+        return result
+
+    for turn in range(turns):
+        for chat_id in chat_ids:
+            count = timed("persisted_count", store.persisted_count, user_id, chat_id)
+            timed("append", store.append_messages, user_id, chat_id, count, turn_messages(turn), chat_id)
+    for chat_id in chat_ids:
+        messages = timed("load_messages", store.load_messages, user_id, chat_id)
+        assert len(messages) == turns * 2
+    cursor = None
+    while True:
+        page, cursor = timed("list_chats", store.list_chats, user_id, CHAT_LIST_PAGE_SIZE, cursor)
+        if not cursor:
+            break
+    for chat_id in chat_ids:
+        timed("delete_chat", store.delete_chat, user_id, chat_id)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--firestore", action="store_true", help="also measure Firestore (needs credentials)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [("memory", MemoryChatStore()), ("sqlite", SQLiteChatStore(os.path.join(tmp, "bench.db")))]
+        if args.firestore:
+            firestore = FirestoreChatStore()
+            if firestore.available():
+                stores.append(("firestore", firestore))
+            else:
+                print("firestore: skipped, no firebase_admin app is initialised")
+
+        print(f"{args.chats} chats x {args.turns} turns (2 messages per append)")
+        print(f"{'store':>10} {'operation':>16} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'ops/s':>10}")
+        for name, store in stores:
+            for op, values in run_store(store, args.chats, args.turns).items():
+                values.sort()
+                p95 = values[max(int(len(values) * 0.95) - 1, 0)]
+                print(f"{name:>10} {op:>16} {len(values):>6} {statistics.median(values) * 1000:>8.3f} "
+                      f"{p95 * 1000:>8.3f} {len(values) / sum(values):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,424 @@
 from firebase_admin import firestore as admin_firestore
+from collections import OrderedDict
+from abc import ABC, abstractmethod
 from datetime import datetime
+import firebase_admin
+import threading
+import sqlite3
+import time
 import uuid
 import os
 
-_db = None
+CHAT_STORE = os.getenv("CHAT_STORE", "firestore")
+CHAT_DB_PATH = os.getenv("CHAT_DB_PATH", "chats.db")
+CHAT_SAVE_DEBOUNCE = float(os.getenv("CHAT_SAVE_DEBOUNCE", "1.0"))
+CHAT_SAVE_MAX_DELAY = float(os.getenv("CHAT_SAVE_MAX_DELAY", "5.0"))
+CHAT_SAVE_MAX_ATTEMPTS = int(os.getenv("CHAT_SAVE_MAX_ATTEMPTS", "3"))
+CHAT_LIST_PAGE_SIZE = int(os.getenv("CHAT_LIST_PAGE_SIZE", "20"))
+CHAT_LIST_CACHE_TTL = float(os.getenv("CHAT_LIST_CACHE_TTL", "60"))
+FIRESTORE_BATCH_LIMIT = 450
 
-def _get_db():
-    global _db
-    if _db is None:
+_store = None
+_store_lock = threading.Lock()
+_persisted_counts = {}
+_counts_lock = threading.Lock()
+_chat_list_cache = {}
+_chat_list_lock = threading.Lock()
+
+
+class ChatStore(ABC):
+    """Storage backend for chats and their messages."""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def persisted_count(self, user_id: str, chat_id: str) -> int:
+        pass
+
+    @abstractmethod
+    def append_messages(self, user_id: str, chat_id: str, start_index: int, new_messages: list, title: str):
+        """Store new_messages at start_index onwards and update the chat's title and timestamp."""
+
+    @abstractmethod
+    def load_messages(self, user_id: str, chat_id: str) -> list:
+        pass
+
+    @abstractmethod
+    def list_chats(self, user_id: str, limit: int, after: tuple = None) -> tuple:
+        """Return (chats, next_cursor), most recent first; the cursor is the last chat's (updated_at, id)."""
+
+    @abstractmethod
+    def delete_chat(self, user_id: str, chat_id: str):
+        pass
+
+
+class FirestoreChatStore(ChatStore):
+    """Chats under users/{user_id}/chats, with messages in a per-chat subcollection."""
+
+    def __init__(self):
+        self._db = None
+
+    def _get_db(self):
+        if self._db is None:
+            try:
+                self._db = admin_firestore.client()
+            except Exception as e:
+                print(f"Firestore Client Initialization Error: {e}")
+                return None
+        return self._db
+
+    def _chat_ref(self, user_id: str, chat_id: str):
+        db = self._get_db()
+        if db is None:
+            raise RuntimeError("Firestore not initialized")
+        return db.collection("users").document(user_id).collection("chats").document(chat_id)
+
+    def available(self) -> bool:
         try:
-            _db = admin_firestore.client()
-        except Exception as e:
-            print(f"Firestore Client Initialization Error: {e}")
-            return None
-    return _db
+            firebase_admin.get_app()
+            return True
+        except ValueError:
+            return False
 
+    def persisted_count(self, user_id: str, chat_id: str) -> int:
+        doc = self._chat_ref(user_id, chat_id).get(timeout=15)
+        if not doc.exists:
+            return 0
+        data = doc.to_dict()
+        return data.get("message_count", len(data.get("messages", [])))
 
-def save_chat(user_id: str, chat_id: str, messages: list, title: str = ""):
-    """Save or update a specific chat for a user."""
-    try:
-        db = _get_db()
+    def append_messages(self, user_id: str, chat_id: str, start_index: int, new_messages: list, title: str):
+        chat_ref = self._chat_ref(user_id, chat_id)
+        messages_ref = chat_ref.collection("messages")
+        db = self._get_db()
+        batch = db.batch()
+        writes = 0
+        for index, msg in enumerate(new_messages, start_index):
+            batch.set(messages_ref.document(f"{index:06d}"), {
+                "index": index,
+                "role": msg["role"],
+                "content": msg["content"]
+            })
+            writes += 1
+            if writes == FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                batch = db.batch()
+                writes = 0
+        batch.set(chat_ref, {
+            "title": title,
+            "updated_at": datetime.utcnow().isoformat(),
+            "message_count": start_index + len(new_messages)
+        }, merge=True)
+        batch.commit()
+
+    def load_messages(self, user_id: str, chat_id: str) -> list:
+        chat_ref = self._chat_ref(user_id, chat_id)
+        doc = chat_ref.get(timeout=15)
+        if not doc.exists:
+            return []
+        # Older chats keep their messages in an array on the chat document
+        messages = list(doc.to_dict().get("messages", []))
+        for message_doc in chat_ref.collection("messages").order_by("index").get(timeout=15):
+            data = message_doc.to_dict()
+            messages.append({"role": data["role"], "content": data["content"]})
+        return messages
+
+    def list_chats(self, user_id: str, limit: int, after: tuple = None) -> tuple:
+        db = self._get_db()
         if db is None:
-            print("Cannot save chat: Firestore not initialized.")
-            return
+            raise RuntimeError("Firestore not initialized")
+        chats_ref = db.collection("users").document(user_id).collection("chats")
+        # Ensure Query.DESCENDING is accessed correctly via the module
+        from google.cloud.firestore_v1.query import Query
+        from google.cloud.firestore_v1.field_path import FieldPath
+        query = (
+            chats_ref.select(["title", "updated_at"])
+            .order_by("updated_at", direction=Query.DESCENDING)
+            .order_by(FieldPath.document_id(), direction=Query.DESCENDING)
+        )
+        if after:
+            query = query.start_after({"updated_at": after[0], FieldPath.document_id(): after[1]})
+        docs = query.limit(limit + 1).get(timeout=15)
+        chats = []
+        for doc in docs[:limit]:
+            data = doc.to_dict()
+            chats.append({
+                "id": doc.id,
+                "title": data.get("title", "Untitled"),
+                "updated_at": data.get("updated_at", ""),
+            })
+        next_cursor = (chats[-1]["updated_at"], chats[-1]["id"]) if len(docs) > limit and chats else None
+        return chats, next_cursor
+
+    def delete_chat(self, user_id: str, chat_id: str):
+        chat_ref = self._chat_ref(user_id, chat_id)
+        db = self._get_db()
+        batch = db.batch()
+        writes = 0
+        for message_ref in chat_ref.collection("messages").list_documents():
+            batch.delete(message_ref)
+            writes += 1
+            if writes == FIRESTORE_BATCH_LIMIT:
+                batch.commit()
+                batch = db.batch()
+                writes = 0
+        batch.delete(chat_ref)
+        batch.commit()
+
+
+class SQLiteChatStore(ChatStore):
+    """Local SQLite file in WAL mode; chats are indexed by (user_id, updated_at)."""
+
+    def __init__(self, db_path: str = CHAT_DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chats ("
+            "user_id TEXT NOT NULL, chat_id TEXT NOT NULL, title TEXT NOT NULL, "
+            "updated_at TEXT NOT NULL, message_count INTEGER NOT NULL, "
+            "PRIMARY KEY (user_id, chat_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chats_user_updated ON chats (user_id, updated_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "user_id TEXT NOT NULL, chat_id TEXT NOT NULL, idx INTEGER NOT NULL, "
+            "role TEXT NOT NULL, content TEXT NOT NULL, "
+            "PRIMARY KEY (user_id, chat_id, idx))"
+        )
+        self._conn.commit()
+
+    def persisted_count(self, user_id: str, chat_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message_count FROM chats WHERE user_id = ? AND chat_id = ?",
+                (user_id, chat_id)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def append_messages(self, user_id: str, chat_id: str, start_index: int, new_messages: list, title: str):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages (user_id, chat_id, idx, role, content) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (user_id, chat_id, index, msg["role"], msg["content"])
+                    for index, msg in enumerate(new_messages, start_index)
+                ]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chats (user_id, chat_id, title, updated_at, message_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, chat_id, title, datetime.utcnow().isoformat(), start_index + len(new_messages))
+            )
+
+    def load_messages(self, user_id: str, chat_id: str) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE user_id = ? AND chat_id = ? ORDER BY idx",
+                (user_id, chat_id)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def list_chats(self, user_id: str, limit: int, after: tuple = None) -> tuple:
+        after_at, after_id = after or (None, None)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chat_id, title, updated_at FROM chats "
+                "WHERE user_id = ? AND (? IS NULL OR (updated_at, chat_id) < (?, ?)) "
+                "ORDER BY updated_at DESC, chat_id DESC LIMIT ?",
+                (user_id, after_at, after_at, after_id, limit + 1)
+            ).fetchall()
+        chats = [{"id": chat_id, "title": title, "updated_at": updated_at} for chat_id, title, updated_at in rows[:limit]]
+        next_cursor = (chats[-1]["updated_at"], chats[-1]["id"]) if len(rows) > limit and chats else None
+        return chats, next_cursor
+
+    def delete_chat(self, user_id: str, chat_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE user_id = ? AND chat_id = ?", (user_id, chat_id))
+            self._conn.execute("DELETE FROM chats WHERE user_id = ? AND chat_id = ?", (user_id, chat_id))
+
+
+class MemoryChatStore(ChatStore):
+    """Process-local store for development and tests; nothing survives a restart."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chats = {}
+
+    def persisted_count(self, user_id: str, chat_id: str) -> int:
+        with self._lock:
+            chat = self._chats.get(user_id, {}).get(chat_id)
+            return len(chat["messages"]) if chat else 0
+
+    def append_messages(self, user_id: str, chat_id: str, start_index: int, new_messages: list, title: str):
+        with self._lock:
+            chat = self._chats.setdefault(user_id, {}).setdefault(chat_id, {"messages": []})
+            del chat["messages"][start_index:]
+            chat["messages"].extend(dict(msg) for msg in new_messages)
+            chat["title"] = title
+            chat["updated_at"] = datetime.utcnow().isoformat()
+
+    def load_messages(self, user_id: str, chat_id: str) -> list:
+        with self._lock:
+            chat = self._chats.get(user_id, {}).get(chat_id)
+            return [dict(msg) for msg in chat["messages"]] if chat else []
+
+    def list_chats(self, user_id: str, limit: int, after: tuple = None) -> tuple:
+        with self._lock:
+            chats = [
+                {"id": chat_id, "title": chat["title"], "updated_at": chat["updated_at"]}
+                for chat_id, chat in self._chats.get(user_id, {}).items()
+                if not after or (chat["updated_at"], chat_id) < tuple(after)
+            ]
+        chats.sort(key=lambda chat: (chat["updated_at"], chat["id"]), reverse=True)
+        next_cursor = (chats[limit - 1]["updated_at"], chats[limit - 1]["id"]) if len(chats) > limit else None
+        return chats[:limit], next_cursor
+
+    def delete_chat(self, user_id: str, chat_id: str):
+        with self._lock:
+            self._chats.get(user_id, {}).pop(chat_id, None)
+
+
+def create_chat_store(backend: str = CHAT_STORE) -> ChatStore:
+    if backend == "firestore":
+        return FirestoreChatStore()
+    if backend == "sqlite":
+        return SQLiteChatStore()
+    if backend == "memory":
+        return MemoryChatStore()
+    raise ValueError(f"Unknown chat store: {backend}")
+
+
+def get_chat_store() -> ChatStore:
+    """Return the process-wide chat store selected by CHAT_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_chat_store()
+    return _store
+
+
+def chat_store_available() -> bool:
+    """Check if chats can be persisted with the configured store."""
+    return get_chat_store().available()
+
+
+class ChatWriter:
+    """Write-behind queue that coalesces chat saves and persists them from one worker thread."""
+
+    def __init__(self, debounce: float = CHAT_SAVE_DEBOUNCE, max_delay: float = CHAT_SAVE_MAX_DELAY,
+                 max_attempts: int = CHAT_SAVE_MAX_ATTEMPTS):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._writing_key = None
+        self._flushing = False
+
+    def enqueue(self, user_id: str, chat_id: str, messages: list):
+        """Queue the latest snapshot of a chat; earlier unsaved snapshots are replaced."""
+        now = time.monotonic()
+        with self._cond:
+            key = (user_id, chat_id)
+            first_queued = self._pending[key][1] if key in self._pending else now
+            due = min(now + self.debounce, first_queued + self.max_delay)
+            self._pending[key] = (list(messages), first_queued, due, 0)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending_messages(self, user_id: str, chat_id: str):
+        """Return the queued snapshot for a chat, or None if nothing is waiting."""
+        with self._cond:
+            entry = self._pending.get((user_id, chat_id))
+            return list(entry[0]) if entry else None
+
+    def discard(self, user_id: str, chat_id: str, timeout: float = 15) -> bool:
+        """Drop any queued snapshot for a chat and wait for a save of it already in progress."""
+        key = (user_id, chat_id)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._pending.pop(key, None)
+            while self._writing_key == key:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            # A failed in-flight save may have re-queued itself
+            self._pending.pop(key, None)
+            return True
+
+    def flush(self, timeout: float = 15) -> bool:
+        """Write every queued chat in queue order and wait until done."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._writing_key is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def _next_due(self):
+        now = time.monotonic()
+        next_wait = None
+        for key, (_, _, due, _) in self._pending.items():
+            if self._flushing or due <= now:
+                return key, 0
+            if next_wait is None or due - now < next_wait:
+                next_wait = due - now
+        return None, next_wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key, wait = self._next_due()
+                while key is None:
+                    self._cond.wait(wait)
+                    key, wait = self._next_due()
+                messages, first_queued, _, attempts = self._pending.pop(key)
+                self._writing_key = key
+            saved = False
+            try:
+                saved = save_chat(key[0], key[1], messages)
+            finally:
+                with self._cond:
+                    # Retry a failed save unless a newer snapshot (which includes it) was queued meanwhile
+                    if not saved and key not in self._pending:
+                        if attempts + 1 < self.max_attempts:
+                            retry_at = time.monotonic() + self.debounce
+                            self._pending[key] = (messages, first_queued, retry_at, attempts + 1)
+                        else:
+                            print(f"Giving up saving chat {key[1]} after {attempts + 1} attempts")
+                    self._writing_key = None
+                    self._cond.notify_all()
+
+
+chat_writer = ChatWriter()
+
+
+def save_chat(user_id: str, chat_id: str, messages: list, title: str = "") -> bool:
+    """Append messages that are not yet persisted to a chat. Returns False if the store write failed."""
+    try:
+        store = get_chat_store()
+        key = (user_id, chat_id)
+        with _counts_lock:
+            persisted = _persisted_counts.get(key)
+        if persisted is None:
+            persisted = store.persisted_count(user_id, chat_id)
+        if len(messages) <= persisted:
+            return True
 
         if not title and messages:
             for msg in messages:
@@ -32,63 +428,82 @@ def save_chat(user_id: str, chat_id: str, messages: list, title: str = ""):
             if not title:
                 title = "New Chat"
 
-        doc_ref = db.collection("users").document(user_id).collection("chats").document(chat_id)
-        doc_ref.set({
-            "messages": messages,
-            "title": title,
-            "updated_at": datetime.utcnow().isoformat()
-        })
-        print(f"Chat {chat_id} saved successfully for user {user_id}")
+        store.append_messages(user_id, chat_id, persisted, messages[persisted:], title)
+
+        with _counts_lock:
+            _persisted_counts[key] = len(messages)
+        invalidate_chat_list(user_id)
+        print(f"Chat {chat_id} saved {len(messages) - persisted} new message(s) for user {user_id}")
+        return True
     except Exception as e:
         print(f"Error saving chat: {e}")
+        return False
 
 
 def load_chat(user_id: str, chat_id: str) -> list:
     """Load a specific chat's messages."""
+    pending = chat_writer.pending_messages(user_id, chat_id)
+    if pending is not None:
+        return pending
+
     try:
-        db = _get_db()
-        if db is None:
-            return []
-        doc_ref = db.collection("users").document(user_id).collection("chats").document(chat_id)
-        doc = doc_ref.get(timeout=15)
-        if doc.exists:
-            return doc.to_dict().get("messages", [])
+        messages = get_chat_store().load_messages(user_id, chat_id)
+        if messages:
+            with _counts_lock:
+                _persisted_counts[(user_id, chat_id)] = len(messages)
+        return messages
     except Exception as e:
         print(f"Error loading chat {chat_id}: {e}")
     return []
 
 
-def get_all_chats(user_id: str) -> list:
-    """Get all chat sessions for a user, sorted by most recent."""
+def invalidate_chat_list(user_id: str):
+    """Drop cached chat list pages for a user."""
+    with _chat_list_lock:
+        _chat_list_cache.pop(user_id, None)
+
+
+def list_chats(user_id: str, limit: int = CHAT_LIST_PAGE_SIZE, after: tuple = None) -> tuple:
+    """Get one page of chat metadata, most recent first. Returns (chats, next_cursor)."""
+    page_key = (limit, after)
+    with _chat_list_lock:
+        entry = _chat_list_cache.get(user_id)
+        if entry and entry["expires_at"] > time.monotonic() and page_key in entry["pages"]:
+            return entry["pages"][page_key]
+
     try:
-        db = _get_db()
-        if db is None:
-            return []
-        chats_ref = db.collection("users").document(user_id).collection("chats")
-        # Ensure Query.DESCENDING is accessed correctly via the module
-        from google.cloud.firestore_v1.query import Query
-        docs = chats_ref.order_by("updated_at", direction=Query.DESCENDING).get(timeout=15)
-        chats = []
-        for doc in docs:
-            data = doc.to_dict()
-            chats.append({
-                "id": doc.id,
-                "title": data.get("title", "Untitled"),
-                "updated_at": data.get("updated_at", ""),
-            })
-        return chats
+        chats, next_cursor = get_chat_store().list_chats(user_id, limit, after)
     except Exception as e:
-        print(f"Error getting all chats for user {user_id}: {e}")
-        return []
+        print(f"Error listing chats for user {user_id}: {e}")
+        return [], None
+
+    with _chat_list_lock:
+        entry = _chat_list_cache.get(user_id)
+        if not entry or entry["expires_at"] <= time.monotonic():
+            entry = {"expires_at": time.monotonic() + CHAT_LIST_CACHE_TTL, "pages": {}}
+            _chat_list_cache[user_id] = entry
+        entry["pages"][page_key] = (chats, next_cursor)
+    return chats, next_cursor
+
+
+def get_all_chats(user_id: str) -> list:
+    """Get all chat sessions for a user, sorted by most recent."""
+    chats, cursor = list_chats(user_id)
+    while cursor:
+        page, cursor = list_chats(user_id, after=cursor)
+        chats = chats + page
+    return chats
 
 
 def delete_chat(user_id: str, chat_id: str):
     """Delete a specific chat."""
+    if not chat_writer.discard(user_id, chat_id):
+        print(f"Chat {chat_id} was still being saved when it was deleted")
     try:
-        db = _get_db()
-        if db is None:
-            return
-        db.collection("users").document(user_id).collection("chats").document(chat_id).delete()
+        get_chat_store().delete_chat(user_id, chat_id)
+        with _counts_lock:
+            _persisted_counts.pop((user_id, chat_id), None)
+        invalidate_chat_list(user_id)
         print(f"Chat {chat_id} deleted successfully.")
     except Exception as e:
         print(f"Error deleting chat {chat_id}: {e}")
@@ -96,4 +511,4 @@ def delete_chat(user_id: str, chat_id: str):
 
 def new_chat_id() -> str:
     """Generate a unique chat ID."""
-    return str(uuid.uuid4())[:8]
\ No newline at end of file
+    return str(uuid.uuid4())[:8]
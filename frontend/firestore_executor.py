@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import threading
+import os
+
+FIRESTORE_WORKERS = int(os.getenv("FIRESTORE_WORKERS", "4"))
+FIRESTORE_QUEUE_SIZE = int(os.getenv("FIRESTORE_QUEUE_SIZE", "32"))
+FIRESTORE_TIMEOUT = float(os.getenv("FIRESTORE_TIMEOUT", "15"))
+
+
+class ExecutorFullError(RuntimeError):
+    pass
+
+
+class BoundedExecutor:
+    """Shared worker pool for blocking Firestore calls with a bounded backlog and per-call timeouts."""
+
+    def __init__(self, max_workers: int = FIRESTORE_WORKERS, queue_size: int = FIRESTORE_QUEUE_SIZE):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="firestore")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._lock = threading.Lock()
+        self._abandoned_futures = set()
+        self.in_flight = 0
+        self.abandoned = 0
+        self.abandoned_total = 0
+        self.rejected_total = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn without blocking; raises ExecutorFullError when the backlog is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_total += 1
+            raise ExecutorFullError("Firestore executor queue is full")
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        self._slots.release()
+        with self._lock:
+            self.in_flight -= 1
+            if future in self._abandoned_futures:
+                self._abandoned_futures.discard(future)
+                self.abandoned -= 1
+
+    def run(self, fn, timeout: float = FIRESTORE_TIMEOUT):
+        """Run fn() on the pool. Return (result, error). Never hangs."""
+        try:
+            future = self.submit(fn)
+        except ExecutorFullError as e:
+            return None, e
+
+        try:
+            return future.result(timeout=timeout), None
+        except FutureTimeoutError:
+            # A call still waiting in the queue is dropped; a running one is left to finish
+            if not future.cancel():
+                with self._lock:
+                    if not future.done():
+                        self._abandoned_futures.add(future)
+                        self.abandoned += 1
+                        self.abandoned_total += 1
+            return None, TimeoutError(f"Firestore call timed out after {timeout}s")
+        except Exception as e:
+            return None, e
+
+    def stats(self) -> dict:
+        """Current gauges and counters."""
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "abandoned": self.abandoned,
+                "abandoned_total": self.abandoned_total,
+                "rejected_total": self.rejected_total,
+            }
+
+
+firestore_executor = BoundedExecutor()
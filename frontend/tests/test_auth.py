@@ -0,0 +1,234 @@
+"""auth session layer against a local stub of the Identity Toolkit, Secure Token and certs endpoints."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import datetime
+import importlib
+import threading
+import json
+import sys
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+
+PROJECT_ID = "talentscout-test"
+KEY_ID = "stub-key"
+
+
+def _make_key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken-stub")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+
+class StubFirebase:
+    """Issues RS256 ID tokens and records every request it serves."""
+
+    def __init__(self):
+        private_pem, self.cert_pem = _make_key_pair()
+        self.signer = crypt.RSASigner.from_string(private_pem, key_id=KEY_ID)
+        self.requests = []
+        self.client_ports = set()
+        self.iat_offset = 0
+        self.refresh_tokens = {}
+
+    def id_token(self, uid: str, expires_in: int = 3600, audience: str = PROJECT_ID) -> str:
+        now = int(time.time()) + self.iat_offset
+        payload = {
+            "iss": f"https://securetoken.google.com/{audience}",
+            "aud": audience,
+            "sub": uid,
+            "user_id": uid,
+            "iat": now,
+            "exp": now + expires_in,
+            "auth_time": now,
+        }
+        return google_jwt.encode(self.signer, payload).decode("ascii")
+
+    def sign_in(self, email: str) -> dict:
+        uid = f"uid-{email.split('@')[0]}"
+        refresh_token = f"refresh-{uid}-{len(self.refresh_tokens)}"
+        self.refresh_tokens[refresh_token] = uid
+        return {
+            "email": email,
+            "localId": uid,
+            "idToken": self.id_token(uid),
+            "refreshToken": refresh_token,
+            "expiresIn": "3600",
+        }
+
+
+def _handler(stub: StubFirebase):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _record(self):
+            path = urlparse(self.path).path
+            stub.requests.append((self.command, path))
+            stub.client_ports.add(self.client_address[1])
+            return path
+
+        def do_GET(self):
+            path = self._record()
+            if path == "/certs":
+                self._send(200, {KEY_ID: stub.cert_pem}, {"Cache-Control": "public, max-age=3600"})
+            else:
+                self._send(404, {"error": {"message": "NOT_FOUND"}})
+
+        def do_POST(self):
+            path = self._record()
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+            if path == "/identity/accounts:signInWithPassword":
+                data = json.loads(body)
+                if data["password"] != "secret123":
+                    self._send(400, {"error": {"message": "INVALID_LOGIN_CREDENTIALS"}})
+                else:
+                    self._send(200, stub.sign_in(data["email"]))
+            elif path == "/identity/accounts:signUp":
+                self._send(200, stub.sign_in(json.loads(body)["email"]))
+            elif path == "/securetoken/token":
+                refresh_token = parse_qs(body)["refresh_token"][0]
+                uid = stub.refresh_tokens.get(refresh_token)
+                if uid is None:
+                    self._send(400, {"error": {"message": "INVALID_REFRESH_TOKEN"}})
+                    return
+                self._send(200, {
+                    "id_token": stub.id_token(uid),
+                    "refresh_token": refresh_token,
+                    "expires_in": "3600",
+                    "user_id": uid,
+                })
+            else:
+                self._send(404, {"error": {"message": "NOT_FOUND"}})
+
+    return Handler
+
+
+@pytest.fixture
+def stub():
+    return StubFirebase()
+
+
+@pytest.fixture
+def auth(stub, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(stub))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    monkeypatch.setenv("FIREBASE_PROJECT_ID", PROJECT_ID)
+    monkeypatch.setenv("FIREBASE_AUTH_URL", f"{base}/identity")
+    monkeypatch.setenv("FIREBASE_TOKEN_URL", f"{base}/securetoken")
+    monkeypatch.setenv("FIREBASE_CERTS_URL", f"{base}/certs")
+    sys.modules.pop("auth", None)
+    module = importlib.import_module("auth")
+    yield module
+
+    module._http.close()
+    server.shutdown()
+    server.server_close()
+    sys.modules.pop("auth", None)
+
+
+def test_login_returns_refreshable_session(auth):
+    result = auth.login("ada@example.com", "secret123")
+
+    assert result["success"]
+    user = result["user"]
+    assert user["localId"] == "uid-ada"
+    assert user["refreshToken"]
+    assert user["expiresAt"] > time.time() + 3000
+
+
+def test_login_maps_firebase_errors(auth):
+    result = auth.login("ada@example.com", "wrong")
+
+    assert not result["success"]
+    assert result["message"] == "Invalid email or password."
+
+
+def test_verified_sessions_are_cached_and_keys_fetched_once(auth, stub):
+    user = auth.login("ada@example.com", "secret123")["user"]
+
+    for _ in range(50):
+        assert auth.ensure_session(user) is user
+
+    assert stub.requests.count(("GET", "/certs")) == 1
+    assert auth._verified_sessions.hits == 49
+    # One pooled keep-alive connection served the login and the certs fetch
+    assert len(stub.client_ports) == 1
+
+
+def test_token_issued_slightly_in_the_future_is_accepted(auth, stub):
+    stub.iat_offset = 5
+    user = auth.login("ada@example.com", "secret123")["user"]
+
+    assert auth.ensure_session(user) is user
+
+
+def test_session_is_refreshed_before_expiry(auth, stub):
+    user = auth.login("ada@example.com", "secret123")["user"]
+    user["expiresAt"] = time.time() + auth.AUTH_REFRESH_MARGIN - 1
+    time.sleep(1)
+
+    renewed = auth.ensure_session(user)
+
+    assert ("POST", "/securetoken/token") in stub.requests
+    assert renewed["idToken"] != user["idToken"]
+    assert renewed["email"] == "ada@example.com"
+    assert renewed["expiresAt"] > time.time() + 3000
+
+
+def test_rejected_refresh_token_ends_session(auth):
+    user = auth.login("ada@example.com", "secret123")["user"]
+    user["refreshToken"] = "revoked"
+    user["expiresAt"] = time.time() + 10
+
+    assert auth.ensure_session(user) is None
+
+
+def test_token_for_another_project_is_rejected(auth, stub):
+    user = auth.login("ada@example.com", "secret123")["user"]
+    user["idToken"] = stub.id_token("uid-ada", audience="someone-else")
+
+    assert auth.ensure_session(user) is None
+
+
+def test_tampered_token_is_rejected(auth):
+    user = auth.login("ada@example.com", "secret123")["user"]
+    header, payload, signature = user["idToken"].split(".")
+    user["idToken"] = ".".join((header, payload, signature[::-1]))
+
+    assert auth.ensure_session(user) is None
@@ -0,0 +1,164 @@
+"""ChatWriter write-behind behaviour against the in-memory store, plus legacy Firestore chat loads."""
+import threading
+import time
+
+import pytest
+
+import chat_history
+from chat_history import ChatWriter, FirestoreChatStore, MemoryChatStore
+
+USER = "user-1"
+
+
+def turn(n: int) -> list:
+    return [{"role": "user", "content": f"question {n}"}, {"role": "assistant", "content": f"answer {n}"}]
+
+
+class RecordingStore(MemoryChatStore):
+    """Memory store that records appends and can fail or block them on demand."""
+
+    def __init__(self):
+        super().__init__()
+        self.appends = []
+        self.failures = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def append_messages(self, user_id, chat_id, start_index, new_messages, title):
+        self.entered.set()
+        self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("store unavailable")
+        self.appends.append((chat_id, start_index, len(new_messages)))
+        super().append_messages(user_id, chat_id, start_index, new_messages, title)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = RecordingStore()
+    monkeypatch.setattr(chat_history, "_store", store)
+    monkeypatch.setattr(chat_history, "_persisted_counts", {})
+    monkeypatch.setattr(chat_history, "_chat_list_cache", {})
+    return store
+
+
+def test_snapshots_of_one_chat_coalesce_into_one_append(store):
+    writer = ChatWriter(debounce=10, max_delay=10)
+    messages = []
+    for n in range(3):
+        messages += turn(n)
+        writer.enqueue(USER, "chat-a", messages)
+
+    assert writer.flush()
+    assert store.appends == [("chat-a", 0, 6)]
+    assert store.load_messages(USER, "chat-a") == messages
+
+
+def test_flush_writes_chats_in_queue_order(store):
+    writer = ChatWriter(debounce=10, max_delay=10)
+    for chat_id in ("chat-c", "chat-a", "chat-b"):
+        writer.enqueue(USER, chat_id, turn(0))
+
+    assert writer.flush()
+    assert [chat_id for chat_id, _, _ in store.appends] == ["chat-c", "chat-a", "chat-b"]
+
+
+def test_failed_save_is_retried(store):
+    store.failures = 1
+    writer = ChatWriter(debounce=0.01, max_delay=1)
+    writer.enqueue(USER, "chat-a", turn(0))
+
+    assert writer.flush()
+    assert store.load_messages(USER, "chat-a") == turn(0)
+
+
+def test_delete_waits_for_a_save_in_progress(store, monkeypatch):
+    writer = ChatWriter(debounce=0, max_delay=0)
+    monkeypatch.setattr(chat_history, "chat_writer", writer)
+    store.release.clear()
+    writer.enqueue(USER, "chat-a", turn(0))
+    assert store.entered.wait(5)
+
+    deleter = threading.Thread(target=chat_history.delete_chat, args=(USER, "chat-a"))
+    deleter.start()
+    time.sleep(0.1)
+    assert deleter.is_alive()
+    store.release.set()
+    deleter.join(5)
+
+    assert writer.flush()
+    assert store.load_messages(USER, "chat-a") == []
+    assert store.persisted_count(USER, "chat-a") == 0
+    assert (USER, "chat-a") not in chat_history._persisted_counts
+
+
+class FakeSnapshot:
+
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeMessages:
+
+    def __init__(self, docs):
+        self._docs = docs
+
+    def order_by(self, field):
+        return FakeMessages(sorted(self._docs, key=lambda doc: doc[field]))
+
+    def get(self, timeout=None):
+        return [FakeSnapshot(doc) for doc in self._docs]
+
+
+class FakeChatRef:
+
+    def __init__(self, data, messages):
+        self._data = data
+        self._messages = messages
+
+    def get(self, timeout=None):
+        return FakeSnapshot(self._data)
+
+    def collection(self, name):
+        return FakeMessages(self._messages)
+
+
+def test_firestore_load_appends_subcollection_after_legacy_array(monkeypatch):
+    legacy = turn(0)
+    appended = [{"index": 3, **turn(1)[1]}, {"index": 2, **turn(1)[0]}]
+    chat_ref = FakeChatRef({"title": "old chat", "messages": legacy}, appended)
+    store = FirestoreChatStore()
+    monkeypatch.setattr(store, "_chat_ref", lambda user_id, chat_id: chat_ref)
+
+    assert store.load_messages(USER, "chat-a") == turn(0) + turn(1)
+
+
+@pytest.mark.parametrize("make_store", [MemoryChatStore, lambda: chat_history.SQLiteChatStore(":memory:")])
+def test_paging_does_not_skip_chats_with_tied_timestamps(make_store, monkeypatch):
+    frozen = chat_history.datetime(2024, 1, 1)
+
+    class FrozenDatetime:
+        @staticmethod
+        def utcnow():
+            return frozen
+
+    monkeypatch.setattr(chat_history, "datetime", FrozenDatetime)
+    store = make_store()
+    chat_ids = [f"chat-{n:02d}" for n in range(7)]
+    for chat_id in chat_ids:
+        store.append_messages(USER, chat_id, 0, turn(0), chat_id)
+
+    seen = []
+    chats, cursor = store.list_chats(USER, 3)
+    seen += [chat["id"] for chat in chats]
+    while cursor:
+        chats, cursor = store.list_chats(USER, 3, cursor)
+        seen += [chat["id"] for chat in chats]
+
+    assert seen == sorted(chat_ids, reverse=True)